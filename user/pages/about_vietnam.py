@@ -1,6 +1,7 @@
 import streamlit as st
 import streamlit.components.v1 as components
 from utils.path_config import img
+from utils.guide_data import destinations
 import base64
 import os
 import html
@@ -38,39 +39,6 @@ def img_to_base64(path: str) -> str:
 def esc(x: str) -> str:
     return html.escape(x, quote=True)
 
-destinations = [
-    ("Ha Long Bay", "destinations/halong.jpg",
-     "A UNESCO World Natural Heritage site, famous for its thousands of limestone islands rising from emerald waters.",
-     "UNESCO • Nature"),
-    ("Hoi An Ancient Town", "destinations/hoian.jpg",
-     "A well-preserved historic town reflecting a unique blend of Vietnamese, Chinese, and Western architectural influences.",
-     "Heritage • Culture"),
-    ("Da Nang", "destinations/danang.jpg",
-     "A modern coastal city known for its beautiful beaches, iconic bridges, and central role in central Vietnam tourism.",
-     "Coastal • Modern"),
-    ("Ha Giang Loop", "destinations/ha_giang_loop.jpg",
-     "A legendary mountain route offering breathtaking landscapes and rich ethnic minority cultures in northern Vietnam.",
-     "Adventure • Highlands"),
-    ("Hanoi Old Quarter", "destinations/hanoi.jpg",
-     "A historic district over 1,000 years old, capturing the traditional lifestyle and cultural identity of Vietnam’s capital.",
-     "Historic • Citylife"),
-    ("Ho Chi Minh City", "destinations/ho_chi_minh_city.jpg",
-     "Vietnam’s largest economic hub, characterized by its dynamic urban life and historical significance.",
-     "Metropolis • Energy"),
-    ("Hue Imperial City", "destinations/hue.jpg",
-     "The former imperial capital of the Nguyen Dynasty, featuring royal architecture and refined court culture.",
-     "Imperial • UNESCO"),
-    ("Nha Trang", "destinations/nhatrang.jpg",
-     "A popular beach destination known for its long coastline, pleasant climate, and resort activities.",
-     "Beach • Resorts"),
-    ("Phu Quoc Island", "destinations/phuquoc.jpg",
-     "Often referred to as Vietnam’s ‘Pearl Island’, famous for pristine beaches and a rich marine ecosystem.",
-     "Island • Relax"),
-    ("Sa Pa", "destinations/sapa.jpg",
-     "A highland town renowned for terraced rice fields, cool climate, and diverse ethnic cultures.",
-     "Terraces • Cool air"),
-]
-
 render_html("""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
@@ -1,4 +1,7 @@
 import os
+import io
+import re
+import gzip
 import json
 import uuid
 import base64
@@ -7,13 +10,14 @@ from typing import Any
 
 import streamlit as st
 import streamlit.components.v1 as components
-import requests
 from datetime import datetime, timezone
 
-API_CHAT_URL = "http://localhost:8000/chat"
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 
 from layout import init_layout, chat_bubble_user, chat_bubble_ai, ai_typing_animation
+from utils.api_client import post_chat, post_chat_many, merge_answers, is_backend_failure
+from utils.guide_data import cities_master
+from utils.local_guide import local_guide
 
 st.set_page_config(
     page_title="Vietnam Travel AI",
@@ -37,18 +41,6 @@ def img_to_b64(path: str) -> str:
     except Exception:
         return ""
 
-def post_chat(query: str) -> str:
-    try:
-        res = requests.post(API_CHAT_URL, json={"query": query}, timeout=45)
-        if not res.ok:
-            return f"Backend error: HTTP {res.status_code}"
-        data = res.json() if res.content else {}
-        return data.get("answer") or "No response received from the API."
-    except requests.exceptions.Timeout:
-        return "Backend timeout. Please try again."
-    except Exception:
-        return "Unable to connect to the backend API."
-
 def scroll_to_bottom():
     components.html(
         """
@@ -67,9 +59,26 @@ def scroll_to_bottom():
 def utc_now() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
-def export_conversation(messages: list[dict]) -> bytes:
-    payload = {"exported_at_utc": utc_now(), "messages": messages}
-    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+EXPORT_FORMATS = {
+    "JSON": ("json", "application/json"),
+    "NDJSON": ("ndjson", "application/x-ndjson"),
+    "NDJSON (gzip)": ("ndjson.gz", "application/gzip"),
+}
+
+def export_conversation(messages: list[dict], fmt: str = "JSON") -> bytes:
+    if fmt == "JSON":
+        payload = {"exported_at_utc": utc_now(), "messages": messages}
+        return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+    # NDJSON: one header line, then one line per message, written as we go
+    buf = io.BytesIO()
+    out = gzip.GzipFile(fileobj=buf, mode="wb") if fmt == "NDJSON (gzip)" else buf
+    out.write(json.dumps({"exported_at_utc": utc_now()}, ensure_ascii=False).encode("utf-8") + b"\n")
+    for m in messages:
+        out.write(json.dumps(m, ensure_ascii=False).encode("utf-8") + b"\n")
+    if out is not buf:
+        out.close()
+    return buf.getvalue()
 
 def bump_seed():
     st.session_state.quick_seed = int.from_bytes(os.urandom(4), "little")
@@ -212,6 +221,52 @@ def build_system_context(p: dict) -> str:
 def enrich_query(user_query: str, profile: dict) -> str:
     return f"{build_system_context(profile)}User question:\n{user_query}"
 
+COMPARE_CUES = re.compile(r"\b(compare|comparison|vs\.?|versus|between|split)\b", re.IGNORECASE)
+
+def split_multi_part(user_query: str) -> list[str]:
+    """Cities a comparative question should be looked up for, in the order mentioned."""
+    if not COMPARE_CUES.search(user_query):
+        return []
+    found = []
+    for c in cities_master:
+        m = re.search(rf"\b{re.escape(c)}\b", user_query, re.IGNORECASE)
+        if m:
+            found.append((m.start(), c))
+    return [c for _, c in sorted(found)] if len(found) >= 2 else []
+
+def answer_query(user_query: str, profile: dict) -> str:
+    # The local guide is English-only; other languages always go to the backend
+    if profile.get("language") == "English":
+        local = local_guide.answer(user_query)
+        if local:
+            return local
+
+    parts = split_multi_part(user_query)
+    if not parts:
+        answer = post_chat(enrich_query(user_query, profile))
+        if is_backend_failure(answer):
+            return local_guide.fallback(user_query) or answer
+        return answer
+    subs = [enrich_query(f"{user_query}\n(Answer this part for {city} only.)", profile) for city in parts]
+    answers = post_chat_many(subs)
+    answers = [
+        (local_guide.fallback(city, k=1) or a) if is_backend_failure(a) else a
+        for city, a in zip(parts, answers)
+    ]
+    merged = merge_answers(parts, answers)
+    # The per-city answers are notes; one more call does the comparison or split the user asked for
+    answer = post_chat(enrich_query(synthesis_query(user_query, merged), profile))
+    return merged if is_backend_failure(answer) else answer
+
+def synthesis_query(user_query: str, notes: str) -> str:
+    return (
+        f"{user_query}\n\n"
+        "Notes gathered for each city separately:\n\n"
+        f"{notes}\n\n"
+        "Using these notes, answer the question above as a whole: compare the cities, "
+        "or divide the time between them, as asked."
+    )
+
 def set_pending(prompt: str):
     st.session_state.pending = prompt
     st.rerun()
@@ -431,96 +486,106 @@ with st.sidebar:
         reset_profile_to_none()
         st.rerun()
 
-    cities_master = [
-        "Hanoi", "Ha Long", "Ninh Binh", "Sa Pa", "Hue", "Da Nang", "Hoi An",
-        "Nha Trang", "Da Lat", "Ho Chi Minh City", "Mekong Delta", "Phu Quoc"
-    ]
-    st.session_state.profile["cities"] = st.multiselect(
-        "Cities",
-        cities_master,
-        default=st.session_state.profile.get("cities", []),
-    )
+    # Edits are batched in a form: nothing reruns until "Apply" is pressed
+    with st.form("profile_form", border=False):
+        picked_cities = st.multiselect(
+            "Cities",
+            cities_master,
+            default=st.session_state.profile.get("cities", []),
+        )
 
-    day_options = ["None"] + [str(i) for i in range(1, 22)]
-    current_days = "None" if st.session_state.profile.get("days") is None else str(int(st.session_state.profile["days"]))
-    picked_days = st.selectbox("Days", day_options, index=safe_index(day_options, current_days, 0))
-    st.session_state.profile["days"] = None if picked_days == "None" else int(picked_days)
+        day_options = ["None"] + [str(i) for i in range(1, 22)]
+        current_days = "None" if st.session_state.profile.get("days") is None else str(int(st.session_state.profile["days"]))
+        picked_days = st.selectbox("Days", day_options, index=safe_index(day_options, current_days, 0))
 
-    budget_opts = ["None", "low", "mid", "high"]
-    picked_budget = st.selectbox(
-        "Budget",
-        budget_opts,
-        index=safe_index(budget_opts, str(st.session_state.profile.get("budget") or "None"), 0),
-    )
-    st.session_state.profile["budget"] = None if picked_budget == "None" else picked_budget
+        budget_opts = ["None", "low", "mid", "high"]
+        picked_budget = st.selectbox(
+            "Budget",
+            budget_opts,
+            index=safe_index(budget_opts, str(st.session_state.profile.get("budget") or "None"), 0),
+        )
 
-    style_opts = ["None", "balanced", "foodie", "culture", "nature", "beach", "luxury"]
-    picked_style = st.selectbox(
-        "Style",
-        style_opts,
-        index=safe_index(style_opts, str(st.session_state.profile.get("style") or "None"), 0),
-    )
-    st.session_state.profile["style"] = None if picked_style == "None" else picked_style
+        style_opts = ["None", "balanced", "foodie", "culture", "nature", "beach", "luxury"]
+        picked_style = st.selectbox(
+            "Style",
+            style_opts,
+            index=safe_index(style_opts, str(st.session_state.profile.get("style") or "None"), 0),
+        )
 
-    pace_opts = ["None", "slow", "balanced", "fast"]
-    picked_pace = st.selectbox(
-        "Pace",
-        pace_opts,
-        index=safe_index(pace_opts, str(st.session_state.profile.get("pace") or "None"), 0),
-    )
-    st.session_state.profile["pace"] = None if picked_pace == "None" else picked_pace
+        pace_opts = ["None", "slow", "balanced", "fast"]
+        picked_pace = st.selectbox(
+            "Pace",
+            pace_opts,
+            index=safe_index(pace_opts, str(st.session_state.profile.get("pace") or "None"), 0),
+        )
 
-    companions_opts = ["None", "solo", "couple", "friends", "family"]
-    picked_comp = st.selectbox(
-        "Companions",
-        companions_opts,
-        index=safe_index(companions_opts, str(st.session_state.profile.get("companions") or "None"), 0),
-    )
-    st.session_state.profile["companions"] = None if picked_comp == "None" else picked_comp
+        companions_opts = ["None", "solo", "couple", "friends", "family"]
+        picked_comp = st.selectbox(
+            "Companions",
+            companions_opts,
+            index=safe_index(companions_opts, str(st.session_state.profile.get("companions") or "None"), 0),
+        )
 
-    season_opts = ["None", "any", "spring", "summer", "autumn", "winter"]
-    picked_season = st.selectbox(
-        "Season",
-        season_opts,
-        index=safe_index(season_opts, str(st.session_state.profile.get("season") or "None"), 0),
-    )
-    st.session_state.profile["season"] = None if picked_season == "None" else picked_season
+        season_opts = ["None", "any", "spring", "summer", "autumn", "winter"]
+        picked_season = st.selectbox(
+            "Season",
+            season_opts,
+            index=safe_index(season_opts, str(st.session_state.profile.get("season") or "None"), 0),
+        )
 
-    interests = ["food", "culture", "nature", "beach", "history", "nightlife", "photography", "adventure", "shopping"]
-    st.session_state.profile["interests"] = st.multiselect(
-        "Interests",
-        interests,
-        default=st.session_state.profile.get("interests", []),
-    )
+        interests = ["food", "culture", "nature", "beach", "history", "nightlife", "photography", "adventure", "shopping"]
+        picked_interests = st.multiselect(
+            "Interests",
+            interests,
+            default=st.session_state.profile.get("interests", []),
+        )
 
-    constraints = ["wheelchair-friendly", "kid-friendly", "no-motorbike", "no-seafood", "vegetarian", "halal"]
-    st.session_state.profile["constraints"] = st.multiselect(
-        "Constraints",
-        constraints,
-        default=st.session_state.profile.get("constraints", []),
-    )
+        constraints = ["wheelchair-friendly", "kid-friendly", "no-motorbike", "no-seafood", "vegetarian", "halal"]
+        picked_constraints = st.multiselect(
+            "Constraints",
+            constraints,
+            default=st.session_state.profile.get("constraints", []),
+        )
 
-    st.subheader("Answer Settings")
-    lang_opts = ["English", "Vietnamese"]
-    st.session_state.profile["language"] = st.selectbox(
-        "Language",
-        lang_opts,
-        index=safe_index(lang_opts, st.session_state.profile.get("language", "English"), 0),
-    )
+        st.subheader("Answer Settings")
+        lang_opts = ["English", "Vietnamese"]
+        picked_language = st.selectbox(
+            "Language",
+            lang_opts,
+            index=safe_index(lang_opts, st.session_state.profile.get("language", "English"), 0),
+        )
 
-    detail_opts = ["Concise", "Balanced", "Detailed"]
-    st.session_state.profile["detail"] = st.selectbox(
-        "Detail",
-        detail_opts,
-        index=safe_index(detail_opts, st.session_state.profile.get("detail", "Detailed"), 2),
-    )
+        detail_opts = ["Concise", "Balanced", "Detailed"]
+        picked_detail = st.selectbox(
+            "Detail",
+            detail_opts,
+            index=safe_index(detail_opts, st.session_state.profile.get("detail", "Detailed"), 2),
+        )
 
-    extras_opts = ["Local tips", "Scams to avoid", "Transport options", "Budget breakdown", "Best time to visit", "Local phrases"]
-    st.session_state.profile["extras"] = st.multiselect(
-        "Include",
-        extras_opts,
-        default=st.session_state.profile.get("extras", []),
-    )
+        extras_opts = ["Local tips", "Scams to avoid", "Transport options", "Budget breakdown", "Best time to visit", "Local phrases"]
+        picked_extras = st.multiselect(
+            "Include",
+            extras_opts,
+            default=st.session_state.profile.get("extras", []),
+        )
+
+        if st.form_submit_button("Apply", use_container_width=True, type="primary"):
+            st.session_state.profile.update(
+                {
+                    "cities": picked_cities,
+                    "days": None if picked_days == "None" else int(picked_days),
+                    "budget": None if picked_budget == "None" else picked_budget,
+                    "style": None if picked_style == "None" else picked_style,
+                    "pace": None if picked_pace == "None" else picked_pace,
+                    "companions": None if picked_comp == "None" else picked_comp,
+                    "season": None if picked_season == "None" else picked_season,
+                    "interests": picked_interests,
+                    "constraints": picked_constraints,
+                    "language": picked_language,
+                    "detail": picked_detail,
+                    "extras": picked_extras,
+                }
+            )
 
     st.subheader("Utilities")
     c1, c2 = st.columns(2)
@@ -539,12 +604,16 @@ with st.sidebar:
             st.rerun()
 
     if len(st.session_state.messages) > 0:
-        blob = export_conversation(st.session_state.messages)
+        export_fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key="export_fmt")
+        export_ext, export_mime = EXPORT_FORMATS[export_fmt]
+        # Serialized only when the button is clicked (callable runs off the script thread)
+        export_snapshot = list(st.session_state.messages)
         st.download_button(
-            "Download chat (JSON)",
-            data=blob,
-            file_name=f"travel_ai_chat_{st.session_state.user_id[:8]}.json",
-            mime="application/json",
+            f"Download chat ({export_fmt})",
+            data=lambda: export_conversation(export_snapshot, export_fmt),
+            file_name=f"travel_ai_chat_{st.session_state.user_id[:8]}.{export_ext}",
+            mime=export_mime,
+            on_click="ignore",
             use_container_width=True,
         )
 
@@ -713,8 +782,7 @@ if st.session_state.pending:
 
         ai_typing_animation(avatar_ai)
 
-        payload = enrich_query(q, st.session_state.profile)
-        answer = post_chat(payload)
+        answer = answer_query(q, st.session_state.profile)
 
         st.session_state.messages.append({"role": "ai", "content": answer})
         scroll_to_bottom()
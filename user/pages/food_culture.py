@@ -8,6 +8,7 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
 sys.path.append(os.path.join(BASE_DIR, "backend"))
 
 from utils.path_config import img
+from utils.guide_data import foods, food_regions
 
 st.set_page_config(
     page_title="Vietnamese Cuisine",
@@ -47,30 +48,6 @@ def img_to_base64(path: str) -> str:
 def esc(x: str) -> str:
     return html.escape(x, quote=True)
 
-foods = [
-    ("Pho", "food/pho.jpg",
-     "Vietnam’s most iconic dish, featuring a clear and aromatic broth with rice noodles and tender meat, commonly enjoyed as breakfast.",
-     "Noodle soup • Classic"),
-    ("Banh Mi", "food/banhmi.jpg",
-     "A unique fusion of Vietnamese flavors and Western influences, known worldwide for its convenience and variety.",
-     "Street food • Fusion"),
-    ("Goi Cuon (Fresh Spring Rolls)", "food/goicuon.jpg",
-     "A light and refreshing dish made with shrimp, pork, herbs, and rice noodles, reflecting a healthy eating philosophy.",
-     "Fresh • Healthy"),
-    ("Bun Cha", "food/buncha.jpg",
-     "A Hanoi specialty consisting of grilled pork served with rice noodles and a sweet-sour dipping sauce.",
-     "Hanoi • Grilled"),
-    ("Cao Lau", "food/cao_lau.jpg",
-     "A distinctive noodle dish from Hoi An, influenced by cultural exchanges and closely tied to the town’s trading history.",
-     "Hoi An • Heritage"),
-    ("Com Tam (Broken Rice)", "food/comtam.jpg",
-     "A popular southern Vietnamese dish that reflects everyday life and creativity in traditional cuisine.",
-     "Southern • Comfort"),
-    ("Banh Xeo", "food/banhxeo.jpg",
-     "A savory crispy pancake filled with shrimp and pork, typically enjoyed in family meals and local gatherings.",
-     "Crispy • Savory"),
-]
-
 render_html("""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
@@ -362,6 +339,12 @@ else:
 
 render_html('<div class="a11-divider"></div>')
 
+regions_html = "\n".join(
+    f'<div class="region reveal" data-a11-token="{A11_TOKEN}" style="--delay:{i * 80}ms">'
+    f'<h4>{esc(name)}</h4><p>{esc(note)}</p></div>'
+    for i, (name, note) in enumerate(food_regions)
+)
+
 render_html(f"""
 <div class="section-head">
   <h3 class="section-title">🌍 Regional Characteristics of Vietnamese Cuisine</h3>
@@ -369,18 +352,7 @@ render_html(f"""
 </div>
 
 <div class="regions">
-  <div class="region reveal" data-a11-token="{A11_TOKEN}" style="--delay:0ms">
-    <h4>Northern Vietnam</h4>
-    <p>Light and balanced flavors, emphasizing subtlety and harmony.</p>
-  </div>
-  <div class="region reveal" data-a11-token="{A11_TOKEN}" style="--delay:80ms">
-    <h4>Central Vietnam</h4>
-    <p>Bold, spicy, and richly seasoned dishes shaped by harsh natural conditions.</p>
-  </div>
-  <div class="region reveal" data-a11-token="{A11_TOKEN}" style="--delay:160ms">
-    <h4>Southern Vietnam</h4>
-    <p>Sweeter and richer flavors with abundant ingredients influenced by river-based culture.</p>
-  </div>
+{regions_html}
 </div>
 """)
 
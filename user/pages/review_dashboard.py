@@ -1,5 +1,6 @@
 import re
 import os
+import time
 import html
 import base64
 from datetime import datetime, timezone
@@ -7,10 +8,17 @@ from datetime import datetime, timezone
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import requests
 import altair as alt
 
-BACKEND_URL = "http://localhost:8000"
+from utils.api_client import wire_stats
+from utils.review_ingest import review_feed, describe_ingest
+from utils.review_prep import SENTIMENTS
+from utils.review_dataset import review_store
+from utils.review_cube import cell_totals
+from utils.review_trend import pick_bucket, floor_to, downsample
+from utils.review_export import EXPORT_FORMATS, export_frame
+from utils.review_sampling import sample_rows, stratified_rows
+from utils.review_timing import span, record, timed, timing_summary, SHOW_TIMINGS
 
 st.set_page_config(
     page_title="Sentiment on Twitter About Traveling in Vietnam",
@@ -18,12 +26,17 @@ st.set_page_config(
     page_icon="💬",
 )
 
+RERUN_T0 = time.perf_counter()
+
 st.session_state.setdefault("_a11_token_twitter_dash", 0)
 st.session_state["_a11_token_twitter_dash"] += 1
 A11_TOKEN = st.session_state["_a11_token_twitter_dash"]
 
 st.session_state.setdefault("_quick_seed", int.from_bytes(os.urandom(4), "little"))
-st.session_state.setdefault("_last_fetch_utc", None)
+
+def show_chart(name: str, chart: alt.Chart):
+    with span(f"chart.{name}"):
+        st.altair_chart(chart, use_container_width=True)
 
 def render_html(s: str):
     cleaned = "\n".join(line.lstrip(" \t") for line in s.splitlines()).strip()
@@ -32,51 +45,6 @@ def render_html(s: str):
 def esc(x) -> str:
     return html.escape(str(x), quote=True)
 
-def detect_first_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
-    for c in candidates:
-        if c in df.columns:
-            return c
-    return None
-
-def detect_text_column(df: pd.DataFrame) -> str | None:
-    return detect_first_col(df, ["clean_tweet", "review_text", "vietnam_segment", "text", "content"])
-
-def detect_time_column(df: pd.DataFrame) -> str | None:
-    return detect_first_col(df, ["created_at", "createdAt", "timestamp", "time", "datetime", "date", "posted_at"])
-
-def detect_user_column(df: pd.DataFrame) -> str | None:
-    return detect_first_col(df, ["username", "user", "screen_name", "author", "user_name", "handle"])
-
-def detect_id_column(df: pd.DataFrame) -> str | None:
-    return detect_first_col(df, ["tweet_id", "id", "status_id", "post_id"])
-
-def detect_lang_column(df: pd.DataFrame) -> str | None:
-    return detect_first_col(df, ["lang", "language"])
-
-def detect_engagement_cols(df: pd.DataFrame) -> dict:
-    return {
-        "likes": detect_first_col(df, ["like_count", "likes", "favorite_count", "favourites"]),
-        "retweets": detect_first_col(df, ["retweet_count", "retweets", "repost_count"]),
-        "replies": detect_first_col(df, ["reply_count", "replies"]),
-        "quotes": detect_first_col(df, ["quote_count", "quotes"]),
-    }
-
-def normalize_sentiment(s) -> str:
-    x = str(s).strip().lower()
-    if x in {"pos", "positive", "positve"}:
-        return "positive"
-    if x in {"neu", "neutral"}:
-        return "neutral"
-    if x in {"neg", "negative"}:
-        return "negative"
-    return "other"
-
-def to_dt(series: pd.Series) -> pd.Series:
-    x = pd.to_datetime(series, errors="coerce", utc=True)
-    if x.notna().any():
-        return x
-    return pd.to_datetime(series.astype(str), errors="coerce", utc=True)
-
 def highlight(text: str, q: str) -> str:
     safe = esc(text)
     q = q.strip()
@@ -85,46 +53,8 @@ def highlight(text: str, q: str) -> str:
     pat = re.compile(re.escape(q), re.IGNORECASE)
     return pat.sub(lambda m: f"<mark>{m.group(0)}</mark>", safe)
 
-STOPWORDS = {
-    "the","and","for","with","that","this","you","your","are","was","were","have","has","had","but","not","from","they","them",
-    "what","when","where","why","how","about","into","out","over","under","just","like","very","really","more","most","less",
-    "its","it's","im","i'm","ive","i've","we","our","us","me","my","mine","their","there","here","than","then","too","also",
-    "in","on","at","to","of","a","an","is","it","as","be","by","or","if","so","do","did","does","can","could","should","would",
-    "rt","via","amp","https","http","co","t","vn","vietnam"
-}
-
-def top_terms(texts: pd.Series, n: int = 20) -> pd.DataFrame:
-    tokens = []
-    for t in texts.dropna().astype(str).tolist():
-        for w in re.findall(r"[a-zA-Z]{3,}", t.lower()):
-            if w in STOPWORDS:
-                continue
-            tokens.append(w)
-    if not tokens:
-        return pd.DataFrame(columns=["term", "count"])
-    s = pd.Series(tokens).value_counts().head(n).reset_index()
-    s.columns = ["term", "count"]
-    return s
-
-@st.cache_data(show_spinner=False, ttl=120)
-def fetch_reviews() -> pd.DataFrame:
-    try:
-        res = requests.get(f"{BACKEND_URL}/fetch/topics", timeout=15)
-        if not res.ok:
-            return pd.DataFrame()
-        data = res.json().get("data", [])
-        return pd.DataFrame(data)
-    except Exception:
-        return pd.DataFrame()
-
-def sample_by_seed(df: pd.DataFrame, n: int, seed: int) -> pd.DataFrame:
-    if df.empty:
-        return df
-    n = max(0, min(n, len(df)))
-    if n == 0:
-        return df.head(0)
-    s = df.sample(frac=1.0, random_state=seed) if len(df) > 1 else df
-    return s.head(n)
+# Duplicate handling: None keeps every row, otherwise the value is the ``fuzzy`` flag
+DEDUPE_MODES = {"Keep all": None, "Remove exact": False, "Remove near-duplicates": True}
 
 render_html("""
 <style>
@@ -305,8 +235,8 @@ with st.sidebar:
     with colr1:
         if st.button("🔄 Refresh data", use_container_width=True):
             st.session_state["_quick_seed"] = int.from_bytes(os.urandom(4), "little")
-            fetch_reviews.clear()
-            st.rerun()
+            st.session_state["_refresh_ticket"] = review_store.request_refresh()
+            st.toast("Refreshing in the background; the page updates once the new data is ready.")
     with colr2:
         if st.button("🎲 Shuffle samples", use_container_width=True):
             st.session_state["_quick_seed"] = int.from_bytes(os.urandom(4), "little")
@@ -314,38 +244,114 @@ with st.sidebar:
 
     st.caption("Filters apply to charts, snippets, samples, and the dataset.")
 
-df = fetch_reviews()
-if df.empty:
-    st.warning("No travel-related tweets available (or backend returned empty data).")
-    st.stop()
+    ws = wire_stats()
+    if ws["requests"]:
+        st.caption(
+            f"Wire: {ws['wire_in'] / 1024:,.0f} KB received for {ws['raw_in'] / 1024:,.0f} KB of data "
+            f"({ws['saved'] / 1024:,.0f} KB saved over {ws['requests']} requests)."
+        )
 
-if st.session_state["_last_fetch_utc"] is None:
-    st.session_state["_last_fetch_utc"] = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+@st.fragment(run_every=1.0)
+def show_load_progress(rendered_version: int | None):
+    p = review_feed.progress()
+    if p["error"]:
+        st.warning(f"Loading stopped after {p['rows']:,} tweets: {p['error']}")
+        if st.button("Resume download"):
+            review_feed.resume()
+            st.rerun()
+        return
+    # Re-render the page once the store has published a newer (partial or full) version
+    current = review_store.current()
+    if current is not None and current.version != rendered_version:
+        st.rerun()
+    if not p["loading"]:
+        st.progress(1.0, text=f"Preparing all {p['rows']:,} tweets…")
+        return
+    label = f"Loading tweets… {p['rows']:,}" + (f" of {p['total']:,}" if p["total"] else "")
+    st.progress(min(p["rows"] / p["total"], 1.0) if p["total"] else 0.0, text=label)
+
+@st.fragment(run_every=1.0)
+def await_store(ticket: int | None):
+    # Re-render the page once the first version is published or the asked-for refresh has run
+    if ticket is None:
+        if review_store.current() is not None:
+            st.rerun()
+    elif review_store.refreshed(ticket):
+        st.session_state.pop("_refresh_ticket", None)
+        st.rerun()
+
+with span("load"):
+    # The published version. Every version is built on the store's thread: the partial
+    # ones of the first paged download, then refreshes, which swap in whole
+    loading = review_feed.ensure_loaded()
+    data = review_store.current()
+    if loading or (data is not None and data.partial):
+        show_load_progress(data.version if data is not None else None)
+
+refresh = review_store.status()
+with st.sidebar:
+    if refresh["as_of"]:
+        st.caption(f"Data as of {refresh['as_of']:%Y-%m-%d %H:%M:%S} UTC"
+                   + (f" · checked {refresh['checked_at']:%H:%M:%S}" if refresh["checked_at"] else "")
+                   + (" · refreshing…" if refresh["refreshing"] else ""))
+    if refresh["error"] and refresh["as_of"]:
+        st.warning(f"Last refresh failed at {refresh['failed_at']:%H:%M:%S} UTC: {refresh['error']}. Showing the previous data.")
+
+if data is None:
+    if refresh["error"]:
+        st.warning(f"Could not load the tweets yet: {refresh['error']}. Retrying in the background.")
+    else:
+        st.info("Preparing the tweets…")
+    await_store(None)
+    st.stop()
+if "_refresh_ticket" in st.session_state:
+    await_store(st.session_state["_refresh_ticket"])
 
-TEXT_COL = detect_text_column(df)
-required_cols = {"sentiment", "topic_name", "emotion"}
-if TEXT_COL is None or not required_cols.issubset(df.columns):
-    st.error("Data is incomplete (missing text / sentiment / topic / emotion).")
+if data.rows == 0:
+    st.warning("No travel-related tweets available (or backend returned empty data).")
     st.stop()
 
-TIME_COL = detect_time_column(df)
-USER_COL = detect_user_column(df)
-ID_COL = detect_id_column(df)
-LANG_COL = detect_lang_column(df)
-ENG = detect_engagement_cols(df)
+ingest = data.ingest
+with st.sidebar:
+    if ingest:
+        st.caption(describe_ingest(ingest))
 
-df = df.copy()
-df["sentiment"] = df["sentiment"].apply(normalize_sentiment)
-df["topic_name"] = df["topic_name"].fillna("Unknown").astype(str)
-df["emotion"] = df["emotion"].fillna("Unknown").astype(str)
-df[TEXT_COL] = df[TEXT_COL].fillna("").astype(str)
+if not data.complete:
+    st.error("Data is incomplete (no tweet text column).")
+    st.stop()
+if data.inferred:
+    st.sidebar.caption("Labels inferred locally: " + ", ".join(data.inferred))
+
+TEXT_COL = data.text_col
+TIME_COL = data.time_col
+USER_COL = data.user_col
+ID_COL = data.id_col
+LANG_COL = data.lang_col
+ENG = data.eng
+
+# Shared by every session without copying; ``frame()`` is a copy-on-write view of it
+df, mem, index = data.frame(), data.mem, data.index
+# With the DuckDB engine the rows stay in Parquet: the warehouse answers the filter
+# widgets like FilterIndex, and each view pulls only result-sized data from it
+wh = data.warehouse
+if wh is not None:
+    index = wh
 
-if TIME_COL is not None:
-    df[TIME_COL] = to_dt(df[TIME_COL])
+with st.sidebar:
+    with st.expander("Dataset memory"):
+        st.caption(f"{mem['before'] / 2**20:,.1f} MB as received → {mem['after'] / 2**20:,.1f} MB compacted")
+        st.dataframe(
+            pd.DataFrame(
+                [(c, b / 2**20, a / 2**20) for c, (b, a) in mem["columns"].items()],
+                columns=["column", "before MB", "after MB"],
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
 
-topics = sorted(df["topic_name"].dropna().unique().tolist())
-emotions = sorted(df["emotion"].dropna().unique().tolist())
-sentiments = ["positive", "neutral", "negative", "other"]
+topics = sorted(index.values("topic_name"))
+emotions = sorted(index.values("emotion"))
+sentiments = SENTIMENTS
 
 with st.container():
     filtA, filtB, filtC, filtD = st.columns([1.2, 1.2, 1.2, 1.4])
@@ -356,83 +362,103 @@ with st.container():
     with filtC:
         selected_sentiments = st.multiselect("Sentiment", sentiments, default=["positive", "neutral", "negative"])
     with filtD:
-        search_text = st.text_input("Search in tweet text", placeholder="e.g., food, Ha Long, traffic...")
+        search_text = st.text_input("Search in tweet text", placeholder="e.g., food, Ha Long, traffic... (words, phrases, prefixes)")
 
-    extra1, extra2, extra3, extra4 = st.columns([1.1, 1.1, 1.1, 1.1])
+    extra1, extra2, extra3, extra4, extra5 = st.columns([1.1, 1.1, 1.1, 1.1, 1.4])
     with extra1:
         min_len = st.slider("Min text length", 0, 220, 0)
     with extra2:
-        dedupe = st.toggle("Remove duplicates", value=True)
+        dedupe = st.selectbox("Duplicates", list(DEDUPE_MODES), index=1)
     with extra3:
         exclude_rt = st.toggle("Exclude RT", value=True)
     with extra4:
-        max_rows = st.selectbox("Max rows", [500, 1000, 3000, 10000, "All"], index=2)
-
-fdf = df.copy()
-
-if selected_topic != "All":
-    fdf = fdf[fdf["topic_name"] == selected_topic]
-
-if selected_sentiments:
-    fdf = fdf[fdf["sentiment"].isin(selected_sentiments)]
-else:
-    fdf = fdf.iloc[0:0]
-
-if selected_emotions:
-    fdf = fdf[fdf["emotion"].isin(selected_emotions)]
-
-if search_text.strip():
-    q = search_text.strip().lower()
-    fdf = fdf[fdf[TEXT_COL].str.lower().str.contains(q, na=False)]
-
-if min_len > 0:
-    fdf = fdf[fdf[TEXT_COL].str.len() >= min_len]
+        max_rows = st.selectbox("Max rows", [500, 1000, 3000, 10000, "All"], index=2,
+                                help="Rows shown in Snippets, Samples and Data; charts and counts cover every matching tweet.")
+    with extra5:
+        window = None
+        time_span = index.time_range()
+        if time_span is not None:
+            first_day, last_day = time_span[0].date(), time_span[1].date()
+            picked = st.date_input("Date range (UTC)", value=(first_day, last_day), min_value=first_day, max_value=last_day)
+            # While only the start is picked the input returns one date; keep the full range until then
+            if isinstance(picked, (tuple, list)) and len(picked) == 2 and tuple(picked) != (first_day, last_day):
+                window = (pd.Timestamp(picked[0], tz="UTC"), pd.Timestamp(picked[1], tz="UTC") + pd.Timedelta(days=1))
+                st.caption(f"{index.window_count(*window):,} tweets in range")
+
+with span("filter"):
+    # Bitmaps resolve the label, length and RT filters; rows are only materialized once, at the end
+    allowed = {
+        "topic_name": None if selected_topic == "All" else [selected_topic],
+        "sentiment": selected_sentiments,
+        "emotion": selected_emotions or None,
+    }
+    if wh is not None:
+        sel = wh.select(allowed, min_len, exclude_rt, window, search_text, DEDUPE_MODES[dedupe])
+        total = sel.count()
+        fdf = sel.rows() if max_rows == "All" else sel.rows(int(max_rows))
+    else:
+        ids = index.select(allowed, min_len=min_len, exclude_rt=exclude_rt, window=window)
 
-if exclude_rt:
-    fdf = fdf[~fdf[TEXT_COL].str.match(r"^\s*rt\s+@?", case=False, na=False)]
+        if search_text.strip():
+            ids = data.text_index().search(search_text, within=ids)
 
-if dedupe:
-    fdf = fdf.drop_duplicates(subset=[TEXT_COL])
+        if DEDUPE_MODES[dedupe] is not None:
+            ids = index.first_per_text(ids, fuzzy=DEDUPE_MODES[dedupe])
 
-if max_rows != "All":
-    fdf = fdf.head(int(max_rows))
+        # Charts and counts cover every matching tweet; Max rows only caps the row-level views
+        total = len(ids)
+        fdf = df.iloc[ids if max_rows == "All" else ids[: int(max_rows)]]
 
 render_html('<div class="hr"></div>')
 
-tab_overview, tab_explore, tab_snippets, tab_samples, tab_data = st.tabs(
-    ["📌 Overview", "📊 Explore", "🪄 Snippets", "🧭 Samples", "📄 Data"]
-)
-
-with tab_overview:
-    total = len(fdf)
-    if total == 0:
-        st.info("No rows match the current filters.")
-        st.stop()
-
-    pos_rate = round((fdf["sentiment"] == "positive").mean() * 100, 1)
-    neu_rate = round((fdf["sentiment"] == "neutral").mean() * 100, 1)
-    neg_rate = round((fdf["sentiment"] == "negative").mean() * 100, 1)
-    net = round(pos_rate - neg_rate, 1)
-
-    top_topic = fdf["topic_name"].value_counts().index[0] if not fdf["topic_name"].value_counts().empty else "N/A"
-    top_emotion = fdf["emotion"].value_counts().index[0] if not fdf["emotion"].value_counts().empty else "N/A"
-
-    uniq_topics = int(fdf["topic_name"].nunique())
-    uniq_emotions = int(fdf["emotion"].nunique())
-    uniq_users = int(fdf[USER_COL].nunique()) if USER_COL else None
-    avg_len = int(round(fdf[TEXT_COL].str.len().mean(), 0)) if total else 0
-
-    render_html('<div class="panel">')
-    k1, k2, k3, k4, k5, k6 = st.columns(6)
-    k1.metric("Tweets", f"{total:,}")
-    k2.metric("😊 Positive", f"{pos_rate}%")
-    k3.metric("😐 Neutral", f"{neu_rate}%")
-    k4.metric("😟 Negative", f"{neg_rate}%")
-    k5.metric("Net score", f"{net}")
-    k6.metric("Avg length", f"{avg_len}")
-    render_html("</div>")
-
-    render_html(f"""
+def chart_cells() -> pd.DataFrame:
+    # Chart counts: sliced from the cube, or aggregated once from the selected rows
+    with span("cells"):
+        if wh is not None:
+            return sel.cells()
+        cells, _ = data.chart_cells(ids, allowed, min_len, exclude_rt, window,
+                                    dedupe=DEDUPE_MODES[dedupe], searched=bool(search_text.strip()))
+        return cells
+
+# Only the selected view runs; the others cost nothing until they are picked
+VIEWS = ["📌 Overview", "📊 Explore", "🪄 Snippets", "🧭 Samples", "📄 Data"]
+view = st.segmented_control("View", VIEWS, default=VIEWS[0], key="dash_view", label_visibility="collapsed") or VIEWS[0]
+
+if view == "📌 Overview":
+    with span("overview"):
+        if total == 0:
+            st.info("No rows match the current filters.")
+            st.stop()
+
+        cells = chart_cells()
+
+        sent_vc = cell_totals(cells, "sentiment")
+        pos_rate = round(sent_vc.get("positive", 0) / total * 100, 1)
+        neu_rate = round(sent_vc.get("neutral", 0) / total * 100, 1)
+        neg_rate = round(sent_vc.get("negative", 0) / total * 100, 1)
+        net = round(pos_rate - neg_rate, 1)
+
+        topic_vc = cell_totals(cells, "topic_name")
+        emotion_vc = cell_totals(cells, "emotion")
+        top_topic = topic_vc.index[0] if not topic_vc.empty else "N/A"
+        top_emotion = emotion_vc.index[0] if not emotion_vc.empty else "N/A"
+
+        uniq_topics = len(topic_vc)
+        uniq_emotions = len(emotion_vc)
+        uniq_users = (sel.distinct(USER_COL) if wh is not None else int(df[USER_COL].iloc[ids].nunique())) if USER_COL else None
+        avg_len = int(round(cells["len_sum"].sum() / total, 0)) if total else 0
+
+        render_html('<div class="panel">')
+        k1, k2, k3, k4, k5, k6 = st.columns(6)
+        k1.metric("Tweets", f"{total:,}")
+        k2.metric("😊 Positive", f"{pos_rate}%")
+        k3.metric("😐 Neutral", f"{neu_rate}%")
+        k4.metric("😟 Negative", f"{neg_rate}%")
+        k5.metric("Net score", f"{net}")
+        k6.metric("Avg length", f"{avg_len}")
+        render_html("</div>")
+
+        render_html(f"""
 <div class="note">
   <div style="display:flex; align-items:center; justify-content:space-between; gap:12px;">
     <div>
@@ -446,181 +472,204 @@ with tab_overview:
       </div>
     </div>
     <div style="text-align:right; color: rgba(100,116,139,.95); font-size:12px;">
-      Last fetch: <b>{esc(st.session_state["_last_fetch_utc"])}</b>
+      Data as of: <b>{esc(f"{data.as_of:%Y-%m-%d %H:%M:%S} UTC")}</b>
     </div>
   </div>
 </div>
 """)
 
-    c1, c2 = st.columns([1, 1])
-
-    with c1:
-        st.markdown('<div class="section-title">Sentiment distribution</div>', unsafe_allow_html=True)
-        s_cnt = fdf["sentiment"].value_counts().reset_index()
-        s_cnt.columns = ["sentiment", "count"]
-        donut = (
-            alt.Chart(s_cnt)
-            .mark_arc(innerRadius=62)
-            .encode(
-                theta=alt.Theta("count:Q"),
-                color=alt.Color("sentiment:N", legend=alt.Legend(title="Sentiment")),
-                tooltip=["sentiment:N", "count:Q"],
-            )
-            .properties(height=320)
-        )
-        st.altair_chart(donut, use_container_width=True)
-
-    with c2:
-        st.markdown('<div class="section-title">Top topics</div>', unsafe_allow_html=True)
-        t_cnt = fdf["topic_name"].value_counts().head(12).reset_index()
-        t_cnt.columns = ["topic_name", "count"]
-        bar = (
-            alt.Chart(t_cnt)
-            .mark_bar()
-            .encode(
-                x=alt.X("count:Q", title="Tweets"),
-                y=alt.Y("topic_name:N", sort="-x", title="Topic"),
-                tooltip=["topic_name:N", "count:Q"],
-            )
-            .properties(height=320)
-        )
-        st.altair_chart(bar, use_container_width=True)
-
-    if TIME_COL is not None and pd.api.types.is_datetime64_any_dtype(fdf[TIME_COL]):
-        tf = fdf.dropna(subset=[TIME_COL]).copy()
-        if not tf.empty:
-            st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
-            st.markdown('<div class="section-title">Sentiment trend</div><div class="section-sub">Daily counts in the current filtered view</div>', unsafe_allow_html=True)
-            tf["day"] = tf[TIME_COL].dt.floor("D")
-            ts = tf.groupby(["day", "sentiment"]).size().reset_index(name="count")
-            line = (
-                alt.Chart(ts)
-                .mark_line(point=True)
+        c1, c2 = st.columns([1, 1])
+
+        with c1:
+            st.markdown('<div class="section-title">Sentiment distribution</div>', unsafe_allow_html=True)
+            s_cnt = sent_vc.reset_index()
+            s_cnt.columns = ["sentiment", "count"]
+            donut = (
+                alt.Chart(s_cnt)
+                .mark_arc(innerRadius=62)
                 .encode(
-                    x=alt.X("day:T", title="Day"),
-                    y=alt.Y("count:Q", title="Tweets"),
-                    color=alt.Color("sentiment:N", title="Sentiment"),
-                    tooltip=["day:T", "sentiment:N", "count:Q"],
+                    theta=alt.Theta("count:Q"),
+                    color=alt.Color("sentiment:N", legend=alt.Legend(title="Sentiment")),
+                    tooltip=["sentiment:N", "count:Q"],
                 )
-                .properties(height=280)
+                .properties(height=320)
             )
-            st.altair_chart(line, use_container_width=True)
-
-with tab_explore:
-    if len(fdf) == 0:
-        st.info("No rows match the current filters.")
-        st.stop()
-
-    left, right = st.columns([1, 1])
-
-    with left:
-        st.markdown('<div class="section-title">Emotion distribution</div><div class="section-sub">Top 12 in the filtered view</div>', unsafe_allow_html=True)
-        e_cnt = fdf["emotion"].value_counts().head(12).reset_index()
-        e_cnt.columns = ["emotion", "count"]
-        ebar = (
-            alt.Chart(e_cnt)
-            .mark_bar()
-            .encode(
-                x=alt.X("count:Q", title="Tweets"),
-                y=alt.Y("emotion:N", sort="-x", title="Emotion"),
-                tooltip=["emotion:N", "count:Q"],
+            show_chart("sentiment", donut)
+
+        with c2:
+            st.markdown('<div class="section-title">Top topics</div>', unsafe_allow_html=True)
+            t_cnt = topic_vc.head(12).reset_index()
+            t_cnt.columns = ["topic_name", "count"]
+            bar = (
+                alt.Chart(t_cnt)
+                .mark_bar()
+                .encode(
+                    x=alt.X("count:Q", title="Tweets"),
+                    y=alt.Y("topic_name:N", sort="-x", title="Topic"),
+                    tooltip=["topic_name:N", "count:Q"],
+                )
+                .properties(height=320)
             )
-            .properties(height=360)
-        )
-        st.altair_chart(ebar, use_container_width=True)
+            show_chart("topics", bar)
+
+        if TIME_COL is not None and pd.api.types.is_datetime64_any_dtype(df[TIME_COL]):
+            tf = cells.dropna(subset=["day"])
+            if not tf.empty:
+                st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
+                # Bucket size follows the visible range; hourly counts need the rows, coarser ones come from the day cells
+                bucket = pick_bucket(tf["day"].min(), tf["day"].max() + pd.Timedelta(days=1))
+                if bucket == "hour" and wh is not None:
+                    ts = sel.trend("hour")
+                elif bucket == "hour":
+                    hours = df[[TIME_COL, "sentiment"]].iloc[ids].dropna(subset=[TIME_COL])
+                    ts = hours.groupby([floor_to(hours[TIME_COL], "hour").rename("day"), "sentiment"], observed=True).size()
+                else:
+                    ts = tf.groupby([floor_to(tf["day"], bucket), "sentiment"], observed=True)["count"].sum()
+                ts = downsample(ts[ts > 0].reset_index(name="count"), "day", "count", "sentiment")
+                st.markdown(f'<div class="section-title">Sentiment trend</div><div class="section-sub">Counts per {bucket} in the current filtered view</div>', unsafe_allow_html=True)
+                line = (
+                    alt.Chart(ts)
+                    .mark_line(point=True)
+                    .encode(
+                        x=alt.X("day:T", title=bucket.capitalize()),
+                        y=alt.Y("count:Q", title="Tweets"),
+                        color=alt.Color("sentiment:N", title="Sentiment"),
+                        tooltip=["day:T", "sentiment:N", "count:Q"],
+                    )
+                    .properties(height=280)
+                )
+                show_chart("trend", line)
 
-    with right:
-        st.markdown('<div class="section-title">Topic × Sentiment</div><div class="section-sub">Heatmap over top topics</div>', unsafe_allow_html=True)
-        pivot = (
-            fdf.pivot_table(index="topic_name", columns="sentiment", values=TEXT_COL, aggfunc="count", fill_value=0)
-            .reset_index()
-        )
-        long = pivot.melt(id_vars=["topic_name"], var_name="sentiment", value_name="count")
-        top_topics = fdf["topic_name"].value_counts().head(14).index.tolist()
-        long = long[long["topic_name"].isin(top_topics)]
-        heat = (
-            alt.Chart(long)
-            .mark_rect()
-            .encode(
-                x=alt.X("sentiment:N", title="Sentiment"),
-                y=alt.Y("topic_name:N", sort=top_topics, title="Topic"),
-                color=alt.Color("count:Q", title="Count"),
-                tooltip=["topic_name:N", "sentiment:N", "count:Q"],
-            )
-            .properties(height=360)
-        )
-        st.altair_chart(heat, use_container_width=True)
+if view == "📊 Explore":
+    with span("explore"):
+        if total == 0:
+            st.info("No rows match the current filters.")
+            st.stop()
 
-    st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
+        cells = chart_cells()
 
-    k1, k2 = st.columns([1.2, 1.0])
-    with k1:
-        st.markdown('<div class="section-title">Top terms</div><div class="section-sub">Simple tokenization over tweet text</div>', unsafe_allow_html=True)
-        terms = top_terms(fdf[TEXT_COL], n=22)
-        if terms.empty:
-            st.info("Not enough text to extract terms.")
-        else:
-            term_bar = (
-                alt.Chart(terms)
+        left, right = st.columns([1, 1])
+
+        with left:
+            st.markdown('<div class="section-title">Emotion distribution</div><div class="section-sub">Top 12 in the filtered view</div>', unsafe_allow_html=True)
+            e_cnt = cell_totals(cells, "emotion").head(12).reset_index()
+            e_cnt.columns = ["emotion", "count"]
+            ebar = (
+                alt.Chart(e_cnt)
                 .mark_bar()
                 .encode(
-                    x=alt.X("count:Q", title="Occurrences"),
-                    y=alt.Y("term:N", sort="-x", title="Term"),
-                    tooltip=["term:N", "count:Q"],
+                    x=alt.X("count:Q", title="Tweets"),
+                    y=alt.Y("emotion:N", sort="-x", title="Emotion"),
+                    tooltip=["emotion:N", "count:Q"],
+                )
+                .properties(height=360)
+            )
+            show_chart("emotions", ebar)
+
+        with right:
+            st.markdown('<div class="section-title">Topic × Sentiment</div><div class="section-sub">Heatmap over top topics</div>', unsafe_allow_html=True)
+            pivot = cell_totals(cells, ["topic_name", "sentiment"]).unstack(fill_value=0).reset_index()
+            long = pivot.melt(id_vars=["topic_name"], var_name="sentiment", value_name="count")
+            top_topics = cell_totals(cells, "topic_name").head(14).index.tolist()
+            long = long[long["topic_name"].isin(top_topics)]
+            heat = (
+                alt.Chart(long)
+                .mark_rect()
+                .encode(
+                    x=alt.X("sentiment:N", title="Sentiment"),
+                    y=alt.Y("topic_name:N", sort=top_topics, title="Topic"),
+                    color=alt.Color("count:Q", title="Count"),
+                    tooltip=["topic_name:N", "sentiment:N", "count:Q"],
                 )
                 .properties(height=360)
             )
-            st.altair_chart(term_bar, use_container_width=True)
-
-    with k2:
-        st.markdown('<div class="section-title">Keyword lens</div><div class="section-sub">Sentiment split for a keyword</div>', unsafe_allow_html=True)
-        kw = st.text_input("Keyword", value="", placeholder="e.g., food, taxi, beach, visa")
-        if kw.strip():
-            mask = fdf[TEXT_COL].str.contains(kw.strip(), case=False, na=False)
-            kdf = fdf[mask]
-            if kdf.empty:
-                st.info("No matches for that keyword in the current filters.")
+            show_chart("topic_sentiment", heat)
+
+        st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
+
+        k1, k2 = st.columns([1.2, 1.0])
+        with k1, span("explore.top_terms"):
+            st.markdown('<div class="section-title">Top terms</div><div class="section-sub">Term counts over tweet text, stopwords removed</div>', unsafe_allow_html=True)
+            t1, t2 = st.columns(2)
+            with t1:
+                use_bigrams = st.toggle("Word pairs", value=False)
+            with t2:
+                split_terms = st.toggle("Split by sentiment", value=False)
+            if wh is not None:
+                terms = sel.top_terms(n=22, bigrams=use_bigrams, by="sentiment" if split_terms else None)
             else:
-                kcnt = kdf["sentiment"].value_counts().reindex(sentiments, fill_value=0).reset_index()
-                kcnt.columns = ["sentiment", "count"]
-                kbar = (
-                    alt.Chart(kcnt)
-                    .mark_bar()
-                    .encode(
-                        x=alt.X("count:Q", title="Tweets"),
-                        y=alt.Y("sentiment:N", sort=sentiments, title="Sentiment"),
-                        tooltip=["sentiment:N", "count:Q"],
-                    )
-                    .properties(height=260)
+                terms = data.terms().top(
+                    ids, n=22, bigrams=use_bigrams, by=df["sentiment"] if split_terms else None
                 )
-                st.altair_chart(kbar, use_container_width=True)
+            if terms.empty:
+                st.info("Not enough text to extract terms.")
+            else:
+                enc = {
+                    "x": alt.X("sum(count):Q", title="Occurrences"),
+                    "y": alt.Y("term:N", sort="-x", title="Term"),
+                    "tooltip": ["term:N", "count:Q"],
+                }
+                if split_terms:
+                    enc["color"] = alt.Color("sentiment:N", title="Sentiment")
+                    enc["tooltip"] = ["term:N", "sentiment:N", "count:Q"]
+                term_bar = alt.Chart(terms).mark_bar().encode(**enc).properties(height=360)
+                show_chart("top_terms", term_bar)
+
+        with k2, span("explore.keyword_lens"):
+            st.markdown('<div class="section-title">Keyword lens</div><div class="section-sub">Sentiment split for a keyword</div>', unsafe_allow_html=True)
+            kw = st.text_input("Keyword", value="", placeholder="e.g., food, taxi, beach, visa")
+            if kw.strip():
+                if wh is not None:
+                    ksent = sel.narrow(kw).value_counts("sentiment")
+                else:
+                    ksent = df["sentiment"].iloc[data.text_index().search(kw, within=ids)].value_counts()
+                if ksent.sum() == 0:
+                    st.info("No matches for that keyword in the current filters.")
+                else:
+                    kcnt = ksent.reindex(sentiments, fill_value=0).reset_index()
+                    kcnt.columns = ["sentiment", "count"]
+                    kbar = (
+                        alt.Chart(kcnt)
+                        .mark_bar()
+                        .encode(
+                            x=alt.X("count:Q", title="Tweets"),
+                            y=alt.Y("sentiment:N", sort=sentiments, title="Sentiment"),
+                            tooltip=["sentiment:N", "count:Q"],
+                        )
+                        .properties(height=260)
+                    )
+                    show_chart("keyword_lens", kbar)
+            else:
+                st.info("Enter a keyword to analyze sentiment for matching tweets.")
+
+if view == "🪄 Snippets":
+    with span("snippets"):
+        if total == 0:
+            st.info("No rows match the current filters.")
+            st.stop()
+
+        st.markdown('<div class="section-title">What people say</div><div class="section-sub">Shuffle for new picks; search highlights are supported</div>', unsafe_allow_html=True)
+
+        a, b, c = st.columns([1.0, 1.0, 1.0])
+        with a:
+            n_show = st.slider("Snippets to show", 4, 24, 10)
+        with b:
+            two_cols = st.toggle("Two columns", value=True)
+        with c:
+            show_full = st.toggle("Show full text", value=False)
+
+        if wh is not None:
+            sample = sel.sample(n_show, st.session_state["_quick_seed"])
         else:
-            st.info("Enter a keyword to analyze sentiment for matching tweets.")
-
-with tab_snippets:
-    if len(fdf) == 0:
-        st.info("No rows match the current filters.")
-        st.stop()
-
-    st.markdown('<div class="section-title">What people say</div><div class="section-sub">Shuffle for new picks; search highlights are supported</div>', unsafe_allow_html=True)
-
-    a, b, c = st.columns([1.0, 1.0, 1.0])
-    with a:
-        n_show = st.slider("Snippets to show", 4, 24, 10)
-    with b:
-        two_cols = st.toggle("Two columns", value=True)
-    with c:
-        show_full = st.toggle("Show full text", value=False)
-
-    sample = sample_by_seed(fdf.reset_index(drop=True), n_show, st.session_state["_quick_seed"])
-
-    cols = st.columns(2) if two_cols else [st.container()]
-    for i, r in sample.iterrows():
-        tgt = cols[i % 2] if two_cols else cols[0]
-        with tgt:
-            txt = str(r[TEXT_COL])
-            content = txt if show_full else ((txt[:280] + "…") if len(txt) > 280 else txt)
-            render_html(f"""
+            sample = sample_rows(fdf, n_show, st.session_state["_quick_seed"])
+
+        cols = st.columns(2) if two_cols else [st.container()]
+        for i, r in sample.iterrows():
+            tgt = cols[i % 2] if two_cols else cols[0]
+            with tgt:
+                txt = str(r[TEXT_COL])
+                content = txt if show_full else ((txt[:280] + "…") if len(txt) > 280 else txt)
+                render_html(f"""
 <div class="sample reveal" data-a11-token="{A11_TOKEN}">
   <div class="txt">“{highlight(content, search_text)}”</div>
   <div class="meta">
@@ -631,34 +680,32 @@ with tab_snippets:
 </div>
 """)
 
-with tab_samples:
-    if len(fdf) == 0:
-        st.info("No rows match the current filters.")
-        st.stop()
-
-    st.markdown('<div class="section-title">Representative examples</div><div class="section-sub">Balanced sampling for quick review</div>', unsafe_allow_html=True)
-
-    def pick(df0: pd.DataFrame, s: str, n: int):
-        x = df0[df0["sentiment"] == s]
-        if x.empty:
-            return x
-        seed = st.session_state["_quick_seed"] ^ (hash(s) & 0xFFFFFFFF)
-        return sample_by_seed(x.reset_index(drop=True), n, seed)
-
-    pcol, ncol, gcol = st.columns(3)
-    pos_df = pick(fdf, "positive", 4)
-    neu_df = pick(fdf, "neutral", 4)
-    neg_df = pick(fdf, "negative", 4)
-
-    def render_block(title: str, icon: str, xdf: pd.DataFrame):
-        st.markdown(f"### {icon} {title}")
-        if xdf.empty:
-            render_html("<div style='color:rgba(100,116,139,.95);'>No matching tweets available.</div>")
-            return
-        for _, r in xdf.iterrows():
-            txt = str(r[TEXT_COL])
-            short = (txt[:320] + "…") if len(txt) > 320 else txt
-            render_html(f"""
+if view == "🧭 Samples":
+    with span("samples"):
+        if total == 0:
+            st.info("No rows match the current filters.")
+            st.stop()
+
+        cells = chart_cells()
+
+        st.markdown('<div class="section-title">Representative examples</div><div class="section-sub">Balanced sampling for quick review</div>', unsafe_allow_html=True)
+
+        pcol, ncol, gcol = st.columns(3)
+        if wh is not None:
+            picks = sel.stratified("sentiment", ["positive", "neutral", "negative"], 4, st.session_state["_quick_seed"])
+        else:
+            picks = stratified_rows(fdf, "sentiment", ["positive", "neutral", "negative"], 4, st.session_state["_quick_seed"])
+        pos_df, neu_df, neg_df = picks["positive"], picks["neutral"], picks["negative"]
+
+        def render_block(title: str, icon: str, xdf: pd.DataFrame):
+            st.markdown(f"### {icon} {title}")
+            if xdf.empty:
+                render_html("<div style='color:rgba(100,116,139,.95);'>No matching tweets available.</div>")
+                return
+            for _, r in xdf.iterrows():
+                txt = str(r[TEXT_COL])
+                short = (txt[:320] + "…") if len(txt) > 320 else txt
+                render_html(f"""
 <div class="sample reveal" data-a11-token="{A11_TOKEN}">
   <div class="txt">“{highlight(short, search_text)}”</div>
   <div class="meta">
@@ -667,69 +714,88 @@ with tab_samples:
   </div>
 </div>
 """)
-            with st.expander("Show full tweet"):
-                st.write(txt)
-
-    with pcol:
-        render_block("Positive picks", "😊", pos_df)
-    with ncol:
-        render_block("Neutral picks", "😐", neu_df)
-    with gcol:
-        render_block("Negative picks", "😟", neg_df)
-
-    st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
-    st.markdown('<div class="section-title">Auto insights</div>', unsafe_allow_html=True)
-
-    topic_counts = fdf["topic_name"].value_counts()
-    if not topic_counts.empty:
-        top_topics = topic_counts.head(6).index.tolist()
-        tmp = fdf[fdf["topic_name"].isin(top_topics)].copy()
-        tmp["pos"] = (tmp["sentiment"] == "positive").astype(int)
-        tmp["neg"] = (tmp["sentiment"] == "negative").astype(int)
-        score = tmp.groupby("topic_name")[["pos", "neg"]].sum()
-        score["net"] = score["pos"] - score["neg"]
-        score = score.sort_values("net", ascending=False).reset_index()
-        score["label"] = score["topic_name"].astype(str)
-
-        score_long = score.melt(id_vars=["topic_name", "label"], value_vars=["pos", "neg"], var_name="kind", value_name="count")
-        diverge = (
-            alt.Chart(score_long)
-            .mark_bar()
-            .encode(
-                x=alt.X("count:Q", title="Count"),
-                y=alt.Y("label:N", sort=alt.SortField("topic_name", order="ascending"), title="Topic"),
-                color=alt.Color("kind:N", title="Type"),
-                tooltip=["topic_name:N", "kind:N", "count:Q"],
+                with st.expander("Show full tweet"):
+                    st.write(txt)
+
+        with pcol:
+            render_block("Positive picks", "😊", pos_df)
+        with ncol:
+            render_block("Neutral picks", "😐", neu_df)
+        with gcol:
+            render_block("Negative picks", "😟", neg_df)
+
+        st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">Auto insights</div>', unsafe_allow_html=True)
+
+        topic_counts = cell_totals(cells, "topic_name")
+        if not topic_counts.empty:
+            top_topics = topic_counts.head(6).index.tolist()
+            split = cell_totals(cells[cells["topic_name"].isin(top_topics)], ["topic_name", "sentiment"]).unstack(fill_value=0)
+            score = pd.DataFrame({
+                "pos": split.get("positive", pd.Series(0, index=split.index)),
+                "neg": split.get("negative", pd.Series(0, index=split.index)),
+            })
+            score["net"] = score["pos"] - score["neg"]
+            score = score.sort_values("net", ascending=False).reset_index()
+            score["label"] = score["topic_name"].astype(str)
+
+            score_long = score.melt(id_vars=["topic_name", "label"], value_vars=["pos", "neg"], var_name="kind", value_name="count")
+            diverge = (
+                alt.Chart(score_long)
+                .mark_bar()
+                .encode(
+                    x=alt.X("count:Q", title="Count"),
+                    y=alt.Y("label:N", sort=alt.SortField("topic_name", order="ascending"), title="Topic"),
+                    color=alt.Color("kind:N", title="Type"),
+                    tooltip=["topic_name:N", "kind:N", "count:Q"],
+                )
+                .properties(height=260)
             )
-            .properties(height=260)
+            show_chart("insights", diverge)
+        else:
+            st.info("Not enough data to generate topic insights.")
+
+if view == "📄 Data":
+    with span("data"):
+        if total == 0:
+            st.info("No rows match the current filters.")
+            st.stop()
+
+        st.markdown('<div class="section-title">Dataset</div><div class="section-sub">Choose columns, preview, export</div>', unsafe_allow_html=True)
+
+        base_cols = [c for c in [ID_COL, TIME_COL, USER_COL, LANG_COL, TEXT_COL, "sentiment", "topic_name", "emotion"] if c and c in fdf.columns]
+        extra_cols = [c for c in fdf.columns if c not in base_cols and not str(c).startswith("_")]
+        default_cols = base_cols[:]
+        pick_cols = st.multiselect("Columns", base_cols + extra_cols, default=default_cols)
+
+        table = fdf[pick_cols].reset_index(drop=True) if pick_cols else fdf[base_cols + extra_cols].reset_index(drop=True)
+
+        st.dataframe(table, use_container_width=True, height=440)
+        # The export holds the rows Max rows allows; the DuckDB engine may show fewer of them
+        export_rows = total if max_rows == "All" else min(int(max_rows), total)
+        if len(fdf) < export_rows:
+            st.caption(f"Showing the first {len(fdf):,} of {total:,} matching rows; the export holds {export_rows:,}.")
+        elif len(fdf) < total:
+            st.caption(f"Showing and exporting the first {len(fdf):,} of {total:,} matching rows.")
+
+        export_fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key="data_export_fmt")
+        export_ext, export_mime = EXPORT_FORMATS[export_fmt]
+
+        def build_export() -> bytes:
+            if wh is not None:
+                # Written by DuckDB straight from the selection, so not bound by the rows shown
+                return sel.export(export_fmt, list(table.columns), None if max_rows == "All" else export_rows)
+            # Serialized in chunks
+            return export_frame(table, export_fmt)
+
+        # Built only when the button is clicked
+        st.download_button(
+            f"⬇️ Download filtered data ({export_fmt})",
+            data=lambda: timed("data.export", build_export),
+            file_name=f"twitter_vietnam_sentiment_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.{export_ext}",
+            mime=export_mime,
+            on_click="ignore",
         )
-        st.altair_chart(diverge, use_container_width=True)
-    else:
-        st.info("Not enough data to generate topic insights.")
-
-with tab_data:
-    if len(fdf) == 0:
-        st.info("No rows match the current filters.")
-        st.stop()
-
-    st.markdown('<div class="section-title">Dataset</div><div class="section-sub">Choose columns, preview, export</div>', unsafe_allow_html=True)
-
-    base_cols = [c for c in [ID_COL, TIME_COL, USER_COL, LANG_COL, TEXT_COL, "sentiment", "topic_name", "emotion"] if c and c in fdf.columns]
-    extra_cols = [c for c in fdf.columns if c not in base_cols]
-    default_cols = base_cols[:]
-    pick_cols = st.multiselect("Columns", base_cols + extra_cols, default=default_cols)
-
-    view = fdf[pick_cols].reset_index(drop=True) if pick_cols else fdf.reset_index(drop=True)
-
-    st.dataframe(view, use_container_width=True, height=440)
-
-    csv = view.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        "⬇️ Download filtered CSV",
-        data=csv,
-        file_name=f"twitter_vietnam_sentiment_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv",
-        mime="text/csv",
-    )
 
 components.html(f"""
 <script>
@@ -787,3 +853,9 @@ components.html(f"""
 }})();
 </script>
 """, height=0)
+
+record("rerun", time.perf_counter() - RERUN_T0)
+if SHOW_TIMINGS or st.query_params.get("debug") == "1":
+    with st.sidebar:
+        with st.expander("Stage timings"):
+            st.dataframe(pd.DataFrame(timing_summary()), hide_index=True, use_container_width=True)
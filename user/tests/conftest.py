@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports its modules as ``utils.*`` from the directory it runs in
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.review_cube import build_cells, cell_totals
+from utils.review_dataset import ReviewDataset
+
+TEXTS = [
+    "great pho in hanoi, loved it",
+    "the taxi driver was rude and slow",
+    "ha long bay cruise was stunning",
+    "hotel room was dirty and noisy",
+    "visa extension took forever",
+    "banh mi on the street, cheap and tasty",
+]
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    n = 600
+    # Every text repeats many times, with a few unique variants mixed in
+    text = [TEXTS[i % len(TEXTS)] for i in range(n)]
+    for i in range(0, n, 7):
+        text[i] = f"{text[i]} #{i}"
+    raw = pd.DataFrame({
+        "text": text,
+        "created_at": pd.Timestamp("2024-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 30 * 86400, n), unit="s"),
+        "user": [f"u{i % 50}" for i in range(n)],
+    })
+    return ReviewDataset(raw, {"version": 1})
+
+def _expected(data, ids):
+    cells = build_cells(data.df.iloc[ids], data.time_col)
+    return cell_totals(cells, ["topic_name", "sentiment"])
+
+@pytest.mark.parametrize("dedupe", [None, False, True])
+def test_default_filters_use_the_cube(data, dedupe):
+    allowed = {"topic_name": None, "sentiment": None, "emotion": None}
+    ids = data.index.select(allowed)
+    if dedupe is not None:
+        ids = data.index.first_per_text(ids, fuzzy=dedupe)
+
+    cells, source = data.chart_cells(ids, allowed, dedupe=dedupe)
+
+    assert source != "rows"
+    assert int(cells["count"].sum()) == len(ids)
+    pd.testing.assert_series_equal(cell_totals(cells, ["topic_name", "sentiment"]), _expected(data, ids))
+
+def test_filtered_dedupe_matches_rows(data):
+    allowed = {"topic_name": ["Food", "Transport"], "sentiment": None, "emotion": None}
+    ids = data.index.first_per_text(data.index.select(allowed, min_len=20, exclude_rt=True), fuzzy=False)
+
+    cells, source = data.chart_cells(ids, allowed, min_len=20, exclude_rt=True, dedupe=False)
+
+    assert source == "cube+dups"
+    pd.testing.assert_series_equal(cell_totals(cells, ["topic_name", "sentiment"]), _expected(data, ids))
+
+def test_search_aggregates_rows(data):
+    allowed = {"topic_name": None, "sentiment": None, "emotion": None}
+    ids = data.text_index().search("pho", within=data.index.select(allowed))
+
+    cells, source = data.chart_cells(ids, allowed, searched=True)
+
+    assert source == "rows"
+    assert int(cells["count"].sum()) == len(ids)
+
+@pytest.mark.parametrize("min_len, source", [(30, "cube+dups"), (33, "rows")])
+def test_min_len_off_bucket_aggregates_rows(data, min_len, source):
+    allowed = {"topic_name": None, "sentiment": None, "emotion": None}
+    ids = data.index.first_per_text(data.index.select(allowed, min_len=min_len), fuzzy=False)
+
+    cells, used = data.chart_cells(ids, allowed, min_len=min_len, dedupe=False)
+
+    assert used == source
+    pd.testing.assert_series_equal(cell_totals(cells, ["topic_name", "sentiment"]), _expected(data, ids))
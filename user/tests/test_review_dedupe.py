@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utils.review_dedupe import minhash_signatures, near_duplicate_clusters, normalize_text, text_fingerprint
+
+BASE = [
+    "the night market in hoi an sells lanterns silk and the best cao lau in town",
+    "our bus from hanoi to sapa broke down twice and the driver kept smoking inside",
+    "ha long bay kayaking at dawn was calm quiet and absolutely worth the early alarm",
+    "street vendors in saigon grill corn squid and rice paper pizza late into the night",
+]
+
+def _texts() -> pd.Series:
+    text = []
+    for b in BASE:
+        text += [b, "RT @traveller: " + b.upper(), b + " https://t.co/x1", b + " so good"]
+    return pd.Series(text + ["ok", "", "ok"])
+
+def test_fingerprints_match_normalized_duplicates():
+    norm = normalize_text(_texts())
+    fp = text_fingerprint(norm)
+
+    # Rows share a fingerprint exactly when their normalized text is the same
+    groups = pd.Series(fp).groupby(norm.to_numpy()).nunique()
+    assert (groups == 1).all()
+    assert pd.Series(fp).nunique() == norm.nunique()
+
+def test_near_duplicate_clusters_group_variants():
+    text = _texts()
+    clusters = near_duplicate_clusters(*minhash_signatures(normalize_text(text)))
+
+    for i in range(len(BASE)):
+        assert set(clusters[4 * i:4 * i + 4]) == {4 * i}
+    assert len(set(clusters[:16])) == len(BASE)
+    # Each cluster is named by its first row
+    assert all(clusters[clusters] == clusters) and all(clusters <= np.arange(len(text)))
+
+def test_near_duplicate_clusters_without_words():
+    sig, has_words = minhash_signatures(pd.Series(["", "!!", "same words", "same words"]))
+
+    np.testing.assert_array_equal(near_duplicate_clusters(sig, has_words), [0, 1, 2, 2])
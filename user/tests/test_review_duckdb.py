@@ -0,0 +1,86 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from utils.review_dataset import ReviewDataset
+from utils.review_duckdb import DUCKDB_ROW_CAP, Page, PageSet, ReviewWarehouse
+from utils.review_ingest import merge_delta
+
+TEXTS = [
+    "great pho in hanoi, loved it",
+    "the taxi driver was rude and slow",
+    "ha long bay cruise was stunning",
+    "RT @bob: hotel room was dirty and noisy https://t.co/x",
+    "visa extension took forever",
+]
+
+def _raw(n=400):
+    text = [TEXTS[i % len(TEXTS)] + ("" if i % 3 else f" day {i}") for i in range(n)]
+    return pd.DataFrame({
+        "tweet_id": [str(i) for i in range(n)],
+        "text": text,
+        "sentiment": [None if i % 4 == 0 else "pos" for i in range(n)],
+        "emotion": [None if i % 5 == 0 else "joy" for i in range(n)],
+        "created_at": [f"2024-01-{1 + i % 28:02d}T10:00:00Z" for i in range(n)],
+    })
+
+def test_warehouse_prepares_like_the_frame():
+    raw = _raw()
+    mem = ReviewDataset(raw, {"version": 1})
+    pages = PageSet([Page(raw.iloc[i:i + 150]) for i in range(0, len(raw), 150)])
+    data = ReviewDataset(pages, {"version": 2})
+    wh = data.warehouse
+
+    assert data.rows == len(raw)
+    assert data.inferred == mem.inferred == ["sentiment", "topic_name", "emotion"]
+    out = wh.query("SELECT * FROM reviews ORDER BY _row")
+    for c in ["sentiment", "topic_name", "emotion", "_text_len", "_is_rt"]:
+        assert out[c].astype(str).tolist() == mem.df[c].astype(str).tolist(), c
+    exact = wh.select({}, dedupe=False).count()
+    assert exact == len(mem.index.first_per_text(np.arange(len(raw))))
+    # MinHash is an estimate with its own hash functions here, so only the bounds are fixed
+    assert len(TEXTS) <= wh.select({}, dedupe=True).count() <= exact
+
+def test_warehouse_merges_deltas_like_merge_delta():
+    raw = _raw(6)
+    delta = _raw(8).iloc[[2, 7]].assign(text=["changed", "new row"])
+    pages = PageSet([Page(raw)]).with_delta(delta, "tweet_id", ["4"])
+
+    wh = ReviewWarehouse(pages, 3, "text", "created_at")
+
+    expected = merge_delta(raw, delta, "tweet_id", ["4"])
+    got = wh.query("SELECT tweet_id, text FROM reviews ORDER BY _row")
+    assert got.values.tolist() == expected[["tweet_id", "text"]].values.tolist()
+
+def test_bigrams_skip_stopwords():
+    pages = PageSet([Page(pd.DataFrame({"text": ["street food in hanoi"] * 3, "sentiment": ["positive"] * 3}))])
+    wh = ReviewWarehouse(pages, 4, "text", None)
+
+    terms = wh.select({}).top_terms(10, bigrams=True)["term"].tolist()
+    assert terms == ["street food"]
+
+@pytest.fixture(scope="module")
+def big_selection():
+    raw = _raw(DUCKDB_ROW_CAP * 2)
+    wh = ReviewWarehouse(PageSet([Page(raw)]), 5, "text", "created_at")
+    return wh, wh.select({"sentiment": ["positive"]})
+
+@pytest.mark.parametrize("fmt", ["CSV", "CSV (gzip)", "Parquet"])
+def test_export_is_not_capped(big_selection, fmt):
+    wh, sel = big_selection
+
+    body = sel.export(fmt, ["tweet_id", "text"])
+
+    if fmt == "Parquet":
+        out = pd.read_parquet(io.BytesIO(body))
+    else:
+        out = pd.read_csv(io.BytesIO(body), dtype=str, compression="gzip" if fmt == "CSV (gzip)" else None)
+    expected = wh.query("SELECT tweet_id FROM reviews WHERE sentiment = 'positive' ORDER BY _row")["tweet_id"].tolist()
+    assert len(sel.rows()) == DUCKDB_ROW_CAP < len(expected)
+    assert out.columns.tolist() == ["tweet_id", "text"]
+    assert out["tweet_id"].tolist() == expected
+    assert len(pd.read_parquet(io.BytesIO(sel.export("Parquet", ["text"], limit=7)))) == 7
@@ -0,0 +1,39 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from utils.review_export import EXPORT_CHUNK_ROWS, export_frame
+
+@pytest.fixture(scope="module")
+def frame():
+    n = EXPORT_CHUNK_ROWS + 10_000
+    # The object column is all-None in the first chunk, and only the last chunk has text
+    return pd.DataFrame({
+        "a": range(n),
+        "b": pd.Series([None] * EXPORT_CHUNK_ROWS + ["x"] * 10_000, dtype=object),
+        "c": pd.Series([None] * n, dtype=object),
+        "when": pd.date_range("2024-01-01", periods=n, freq="min", tz="UTC"),
+    })
+
+def test_parquet_export_across_chunks(frame):
+    out = pd.read_parquet(io.BytesIO(export_frame(frame, "Parquet")))
+
+    assert len(out) == len(frame)
+    pd.testing.assert_series_equal(out["a"], frame["a"])
+    assert out["b"].isna().sum() == EXPORT_CHUNK_ROWS and (out["b"].dropna() == "x").all()
+    assert out["c"].isna().all()
+    pd.testing.assert_series_equal(out["when"], frame["when"], check_dtype=False)
+
+@pytest.mark.parametrize("fmt", ["CSV", "CSV (gzip)"])
+def test_csv_export_across_chunks(frame, fmt):
+    body = export_frame(frame, fmt)
+    if fmt == "CSV (gzip)":
+        body = gzip.decompress(body)
+
+    out = pd.read_csv(io.BytesIO(body))
+
+    assert len(out) == len(frame)
+    assert out["a"].tolist() == frame["a"].tolist()
+    assert out["b"].isna().sum() == EXPORT_CHUNK_ROWS
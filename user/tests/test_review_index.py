@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.review_index import FilterIndex, TextIndex
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(3)
+    n = 1000
+    return pd.DataFrame({
+        "sentiment": rng.choice(["positive", "neutral", "negative"], n),
+        "topic_name": rng.choice(["Food", "Transport", "Hotel", "Unknown"], n),
+        "len": rng.integers(0, 200, n),
+        "rt": rng.random(n) < 0.2,
+        "hash": rng.integers(0, 80, n),
+        "near": rng.integers(0, 40, n),
+        "created_at": pd.Series(pd.Timestamp("2024-03-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 20 * 86400, n), unit="s"))
+                        .mask(rng.random(n) < 0.05),
+    })
+
+@pytest.fixture(scope="module")
+def index(frame):
+    return FilterIndex(frame, ["sentiment", "topic_name"], "len", "rt", "hash", "near", "created_at")
+
+def test_bitmaps_hold_each_value(frame, index):
+    assert index.values("topic_name") == list(pd.unique(frame["topic_name"]))
+    for v in index.values("topic_name"):
+        bits = np.unpackbits(index.bitmaps["topic_name"][v], count=len(frame)).astype(bool)
+        np.testing.assert_array_equal(bits, (frame["topic_name"] == v).to_numpy())
+
+@pytest.mark.parametrize("allowed, min_len, exclude_rt", [
+    ({"sentiment": None, "topic_name": None}, 0, False),
+    ({"sentiment": ["positive", "negative"], "topic_name": None}, 0, False),
+    ({"sentiment": ["neutral"], "topic_name": ["Food", "Hotel"]}, 50, True),
+    ({"sentiment": [], "topic_name": None}, 0, False),
+    ({"sentiment": None, "topic_name": ["Nope"]}, 0, True),
+])
+def test_select_matches_pandas(frame, index, allowed, min_len, exclude_rt):
+    mask = pd.Series(True, index=frame.index)
+    for field, values in allowed.items():
+        if values is not None:
+            mask &= frame[field].isin(values)
+    mask &= frame["len"] >= min_len
+    if exclude_rt:
+        mask &= ~frame["rt"]
+
+    ids = index.select(allowed, min_len=min_len, exclude_rt=exclude_rt)
+
+    np.testing.assert_array_equal(ids, np.flatnonzero(mask.to_numpy()))
+
+@pytest.mark.parametrize("first, last", [("2024-03-01", "2024-03-21"), ("2024-03-04", "2024-03-09"), ("2024-03-10", "2024-03-11"), ("2025-01-01", "2025-01-02")])
+def test_window_matches_pandas(frame, index, first, last):
+    start, end = pd.Timestamp(first, tz="UTC"), pd.Timestamp(last, tz="UTC")
+    in_window = (frame["created_at"] >= start) & (frame["created_at"] < end)
+    allowed = {"sentiment": ["positive", "negative"], "topic_name": None}
+
+    ids = index.select(allowed, min_len=30, exclude_rt=True, window=(start, end))
+
+    expected = in_window & frame["sentiment"].isin(allowed["sentiment"]) & (frame["len"] >= 30) & ~frame["rt"]
+    np.testing.assert_array_equal(ids, np.flatnonzero(expected.to_numpy()))
+    assert index.window_count(start, end) == int(in_window.sum())
+
+def test_time_range_skips_missing_times(frame, index):
+    assert index.time_range() == (frame["created_at"].min(), frame["created_at"].max())
+
+@pytest.mark.parametrize("fuzzy, key", [(False, "hash"), (True, "near")])
+def test_first_per_text_matches_drop_duplicates(frame, index, fuzzy, key):
+    ids = index.select({"sentiment": ["positive", "neutral"], "topic_name": None}, min_len=20)
+
+    expected = frame.iloc[ids].drop_duplicates(key).index.to_numpy()
+
+    np.testing.assert_array_equal(index.first_per_text(ids, fuzzy=fuzzy), expected)
+
+SEARCH_TEXTS = pd.Series([
+    "Pho in Hanoi is great",
+    "Ha Long Bay at sunrise",
+    "phone died on the bus to ha long",
+    "long bay, ha! long way",
+    "HOI AN lanterns",
+    "street food: pho, banh mi",
+    "",
+    "... !!!",
+])
+
+def _expected_search(text: pd.Series, query: str) -> np.ndarray:
+    # Consecutive tokens equal to the query words, the last one as a prefix
+    words = query.lower().split()
+    hits = []
+    for i, tokens in enumerate(text.str.lower().str.findall(r"\w+")):
+        for s in range(len(tokens) - len(words) + 1):
+            window = tokens[s:s + len(words)]
+            if window[:-1] == words[:-1] and window[-1].startswith(words[-1]):
+                hits.append(i)
+                break
+    return np.asarray(hits, dtype=np.int64)
+
+@pytest.mark.parametrize("query", ["pho", "PH", "ha long", "ha lo", "long bay", "bay ha", "hanoi great", "x"])
+def test_text_search_matches_tokens(query):
+    index = TextIndex(SEARCH_TEXTS)
+
+    np.testing.assert_array_equal(index.search(query), _expected_search(SEARCH_TEXTS, query))
+
+def test_text_search_within_and_punctuation():
+    index = TextIndex(SEARCH_TEXTS)
+
+    np.testing.assert_array_equal(index.search("pho", within=np.array([2, 3, 5])), [2, 5])
+    expected = np.flatnonzero(SEARCH_TEXTS.str.contains("!!", regex=False).to_numpy())
+    np.testing.assert_array_equal(index.search("!!"), expected)
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from utils.review_prep import missing_labels, prepare_frame
+
+def test_missing_labels_are_inferred_per_row():
+    raw = pd.DataFrame({
+        "text": ["the pho was delicious", "the taxi driver was a scam", "the hotel room was amazing"],
+        "sentiment": ["negative", None, "positive"],
+        "emotion": [None, "fear", None],
+    })
+
+    assert missing_labels(raw) == ["sentiment", "topic_name", "emotion"]
+    df = prepare_frame(raw, "text", None)
+
+    # Labels the backend sent are kept; only the gaps are inferred
+    assert df["sentiment"].tolist() == ["negative", "negative", "positive"]
+    assert df["emotion"].tolist() == ["Unknown", "fear", "joy"]
+    assert df["topic_name"].tolist() == ["Food", "Transport", "Accommodation"]
+
+def test_complete_labels_are_left_alone():
+    raw = pd.DataFrame({
+        "text": ["the pho was delicious"],
+        "sentiment": ["neutral"],
+        "emotion": ["surprise"],
+        "topic_name": ["Culture"],
+    })
+
+    assert missing_labels(raw) == []
+    df = prepare_frame(raw, "text", None)
+    assert df[["sentiment", "emotion", "topic_name"]].iloc[0].tolist() == ["neutral", "surprise", "Culture"]
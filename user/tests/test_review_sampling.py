@@ -0,0 +1,33 @@
+import pandas as pd
+
+from utils.review_sampling import stratified_rows
+
+def test_stratified_rows_draws_within_each_label():
+    df = pd.DataFrame({"label": ["a", "b", "c", None] * 250, "n": range(1000)})
+
+    out = stratified_rows(df, "label", ["a", "c", "missing"], 20, seed=7)
+
+    assert list(out) == ["a", "c", "missing"]
+    assert len(out["a"]) == 20 and set(out["a"]["label"]) == {"a"}
+    assert out["a"]["n"].is_unique
+    assert set(out["c"]["label"]) == {"c"}
+    assert out["missing"].empty
+    # Same seed, same rows; another stratum's presence does not change them
+    again = stratified_rows(df, "label", ["a"], 20, seed=7)
+    pd.testing.assert_frame_equal(out["a"], again["a"])
+
+def test_stratified_rows_small_stratum_returns_all():
+    df = pd.DataFrame({"label": ["x"] * 3 + ["y"] * 100})
+
+    out = stratified_rows(df, "label", ["x"], 10, seed=1)
+
+    assert len(out["x"]) == 3
+
+def test_stratified_rows_buckets_match_groupby():
+    df = pd.DataFrame({"label": ["b", None, "a", "c", "a", "b"] * 400, "n": range(2400)})
+
+    out = stratified_rows(df, "label", ["a", "b", "c"], 10_000, seed=3)
+
+    # With k above every stratum's size, each stratum is all of its rows
+    for label, g in df.groupby("label"):
+        assert sorted(out[label]["n"]) == g["n"].tolist()
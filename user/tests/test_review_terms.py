@@ -0,0 +1,62 @@
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from utils.review_terms import STOPWORDS, TermMatrix
+
+TEXTS = pd.Series([
+    "Street food in Hanoi: street food everywhere",
+    "the food of the street",
+    "Hanoi street food tour, street food again",
+    "Ha Long Bay cruise, bay cruise was great",
+    "cruise of the bay",
+    "",
+])
+SENTIMENT = pd.Series(["positive", "neutral", "positive", "negative", "neutral", "neutral"], name="sentiment")
+
+def _is_term(w: str) -> bool:
+    return len(w) >= 3 and w not in STOPWORDS
+
+def _expected(rows, bigrams=False) -> Counter:
+    counts = Counter()
+    for text in TEXTS.iloc[rows]:
+        words = re.findall(r"[a-z]+", text.lower())
+        if bigrams:
+            counts.update(f"{a} {b}" for a, b in zip(words, words[1:]) if _is_term(a) and _is_term(b))
+        else:
+            counts.update(w for w in words if _is_term(w))
+    return counts
+
+def _as_counter(top: pd.DataFrame) -> Counter:
+    return Counter(dict(zip(top["term"], top["count"])))
+
+def test_top_terms_match_word_counts():
+    tm = TermMatrix(TEXTS)
+    rows = np.array([0, 2, 3, 4])
+
+    assert _as_counter(tm.top(rows, n=100)) == _expected(rows)
+    top = tm.top(rows, n=2)
+    assert top["count"].tolist() == sorted(_expected(rows).values(), reverse=True)[:2]
+
+def test_bigrams_skip_stopwords_between_terms():
+    tm = TermMatrix(TEXTS)
+    rows = np.arange(len(TEXTS))
+
+    got = _as_counter(tm.top(rows, n=100, bigrams=True))
+
+    assert got == _expected(rows, bigrams=True)
+    # "food of the street" has no adjacent term pair, and "cruise of the bay" adds nothing to "cruise, bay"
+    assert "food street" not in got and got["cruise bay"] == 1
+    assert got["street food"] == 4
+
+def test_top_terms_split_by_column():
+    tm = TermMatrix(TEXTS)
+    rows = np.arange(len(TEXTS))
+
+    out = tm.top(rows, n=3, by=SENTIMENT)
+
+    for value, g in out.groupby("sentiment"):
+        expected = _expected(np.flatnonzero(SENTIMENT == value))
+        assert all(expected[t] == c for t, c in zip(g["term"], g["count"]))
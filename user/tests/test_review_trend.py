@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.review_trend import MAX_BUCKETS, downsample, floor_to, lttb, pick_bucket
+
+START = pd.Timestamp("2024-01-01", tz="UTC")
+
+@pytest.mark.parametrize("span, bucket", [
+    (pd.Timedelta(hours=6), "hour"),
+    (pd.Timedelta(days=10), "hour"),
+    (pd.Timedelta(days=60), "day"),
+    (pd.Timedelta(days=3 * 365), "week"),
+    (pd.Timedelta(days=20 * 365), "month"),
+])
+def test_pick_bucket_keeps_range_under_max(span, bucket):
+    assert pick_bucket(START, START + span) == bucket
+    # The picked bucket is the finest whose count over the range stays under the cap
+    freq = {"hour": "h", "day": "D", "week": "W-MON", "month": "MS"}
+    if bucket != "month":
+        assert len(pd.date_range(START, START + span, freq=freq[bucket])) <= MAX_BUCKETS + 1
+
+@pytest.mark.parametrize("bucket, expected", [
+    ("hour", lambda t: t.dt.floor("h")),
+    ("day", lambda t: t.dt.floor("D")),
+    ("week", lambda t: t.dt.to_period("W-SUN").dt.start_time),
+    ("month", lambda t: t.dt.to_period("M").dt.start_time),
+])
+def test_floor_to_matches_periods(bucket, expected):
+    rng = np.random.default_rng(0)
+    t = pd.Series(START + pd.to_timedelta(rng.integers(0, 400 * 86400, 200), unit="s"))
+
+    pd.testing.assert_series_equal(floor_to(t, bucket), expected(t.dt.tz_convert(None)), check_names=False)
+
+def _largest_triangle(x, y, keep, lo, hi, nlo, nhi):
+    ax, ay = x[keep[-1]], y[keep[-1]]
+    bx, by = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+    areas = [abs((ax - bx) * (y[i] - ay) - (ax - x[i]) * (by - ay)) for i in range(lo, hi)]
+    return lo + int(np.argmax(areas))
+
+def test_lttb_picks_the_largest_triangle_per_bucket():
+    rng = np.random.default_rng(1)
+    x = np.arange(500, dtype=float)
+    y = rng.normal(size=500).cumsum()
+    y[123] = 100.0
+
+    idx = lttb(x, y, 50)
+
+    assert len(idx) == 50 and idx[0] == 0 and idx[-1] == 499
+    assert np.all(np.diff(idx) > 0)
+    assert 123 in idx
+    edges = np.linspace(1, 499, 49).astype(int)
+    for i in range(48):
+        nhi = edges[i + 2] if i + 2 < len(edges) else 500
+        assert idx[i + 1] == _largest_triangle(x, y, idx[:i + 1], edges[i], edges[i + 1], edges[i + 1], nhi)
+
+def test_lttb_short_series_untouched():
+    np.testing.assert_array_equal(lttb(np.arange(5), np.ones(5), 10), np.arange(5))
+
+def test_downsample_thins_each_series():
+    days = pd.date_range("2024-01-01", periods=1000, freq="h")
+    ts = pd.DataFrame({
+        "day": np.tile(days, 2),
+        "sentiment": np.repeat(["positive", "negative"], 1000),
+        "count": np.arange(2000) % 17,
+    })
+
+    out = downsample(ts, "day", "count", "sentiment", points=100)
+
+    assert out.groupby("sentiment").size().to_dict() == {"negative": 100, "positive": 100}
+    merged = out.merge(ts, on=["day", "sentiment"], suffixes=("", "_orig"))
+    assert (merged["count"] == merged["count_orig"]).all()
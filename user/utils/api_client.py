@@ -0,0 +1,183 @@
+import os
+import gzip
+import json
+import math
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+
+CHAT_TIMEOUT = 45
+MAX_PARALLEL_CHATS = 4
+
+# Wire format. Request bodies are only compressed when the backend is known to accept it.
+REQUEST_ENCODING = os.getenv("API_REQUEST_ENCODING", "identity").lower()  # identity | gzip | zstd
+ACCEPT_ENCODING = os.getenv("API_ACCEPT_ENCODING", "zstd, gzip, deflate" if zstandard else "gzip, deflate").lower()
+BODY_FORMAT = os.getenv("API_BODY_FORMAT", "json").lower()  # json | msgpack
+COMPRESS_MIN_BYTES = int(os.getenv("API_COMPRESS_MIN_BYTES", "1024"))
+
+TIMEOUT_ANSWER = "Backend timeout. Please try again."
+UNREACHABLE_ANSWER = "Unable to connect to the backend API."
+
+_stats_lock = threading.Lock()
+_wire_stats = {"requests": 0, "raw_out": 0, "wire_out": 0, "raw_in": 0, "wire_in": 0}
+_recent = deque(maxlen=50)
+
+def _record(path: str, raw_out: int, wire_out: int, raw_in: int, wire_in: int):
+    with _stats_lock:
+        _wire_stats["requests"] += 1
+        _wire_stats["raw_out"] += raw_out
+        _wire_stats["wire_out"] += wire_out
+        _wire_stats["raw_in"] += raw_in
+        _wire_stats["wire_in"] += wire_in
+        _recent.append({"path": path, "saved": (raw_out - wire_out) + (raw_in - wire_in), "raw_in": raw_in, "wire_in": wire_in})
+
+def wire_stats() -> dict:
+    with _stats_lock:
+        out = dict(_wire_stats)
+        out["recent"] = list(_recent)
+    out["saved"] = (out["raw_out"] - out["wire_out"]) + (out["raw_in"] - out["wire_in"])
+    return out
+
+def _encode_body(payload: Any) -> tuple[bytes, dict, int]:
+    if BODY_FORMAT == "msgpack" and msgpack is not None:
+        body = msgpack.packb(payload, use_bin_type=True)
+        headers = {"Content-Type": "application/msgpack"}
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+    raw_size = len(body)
+
+    if raw_size >= COMPRESS_MIN_BYTES:
+        if REQUEST_ENCODING == "zstd" and zstandard is not None:
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            headers["Content-Encoding"] = "zstd"
+        elif REQUEST_ENCODING in {"gzip", "zstd"}:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+    return body, headers, raw_size
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    encoding = encoding.strip().lower()
+    if encoding in {"", "identity"}:
+        return body
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        # Servers send either zlib-wrapped or raw deflate streams under this name
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+def decode_payload(body: bytes, content_type: str) -> Any:
+    if not body:
+        return {}
+    if "msgpack" in content_type and msgpack is not None:
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+def api_request(method: str, path: str, payload: Any = None, params: dict | None = None,
+                timeout: float = 15, accept: str | None = None,
+                headers: dict | None = None) -> tuple[int, Any, bytes]:
+    """Call the backend with the configured wire format.
+
+    Returns the status code, the response headers and the decompressed body.
+    Transport errors propagate as ``requests`` exceptions.
+    """
+    headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+    if accept:
+        headers["Accept"] = accept
+    elif BODY_FORMAT == "msgpack" and msgpack is not None:
+        headers["Accept"] = "application/msgpack, application/json;q=0.9"
+
+    body, raw_out = None, 0
+    if payload is not None:
+        body, body_headers, raw_out = _encode_body(payload)
+        headers.update(body_headers)
+
+    res = requests.request(method, f"{BACKEND_URL}{path}", data=body, params=params,
+                           headers=headers, timeout=timeout, stream=True)
+    try:
+        # Read undecoded bytes so both the wire size and the decoded size are known
+        wire = res.raw.read(decode_content=False)
+        content = _decompress(wire, res.headers.get("Content-Encoding", ""))
+    except ReadTimeoutError as e:
+        # Reading the raw stream skips requests' wrapping; restore it so callers see one error family
+        raise requests.exceptions.ReadTimeout(e, request=res.request, response=res) from e
+    except ProtocolError as e:
+        raise requests.exceptions.ConnectionError(e, request=res.request, response=res) from e
+    finally:
+        res.close()
+
+    _record(path, raw_out, len(body or b""), len(content), len(wire))
+    return res.status_code, res.headers, content
+
+def api_call(method: str, path: str, payload: Any = None, params: dict | None = None,
+             timeout: float = 15) -> tuple[int, Any]:
+    status, headers, content = api_request(method, path, payload, params, timeout)
+    if status >= 400:
+        return status, None
+    return status, decode_payload(content, headers.get("Content-Type", ""))
+
+def post_chat(query: str, timeout: float = CHAT_TIMEOUT) -> str:
+    try:
+        status, data = api_call("POST", "/chat", {"query": query}, timeout=timeout)
+        if status >= 400:
+            return f"Backend error: HTTP {status}"
+        return (data or {}).get("answer") or "No response received from the API."
+    except requests.exceptions.Timeout:
+        return TIMEOUT_ANSWER
+    except Exception:
+        return UNREACHABLE_ANSWER
+
+def is_backend_failure(answer: str) -> bool:
+    return answer in {TIMEOUT_ANSWER, UNREACHABLE_ANSWER} or answer.startswith("Backend error:")
+
+def post_chat_many(
+    queries: list[str],
+    max_workers: int = MAX_PARALLEL_CHATS,
+    deadline: float = CHAT_TIMEOUT,
+) -> list[str]:
+    """Send independent sub-queries concurrently; answers come back in input order.
+
+    At most ``max_workers`` requests are in flight, and each one gets ``deadline``
+    seconds. Calls that have not finished by then are reported as timeouts.
+    """
+    if not queries:
+        return []
+    if len(queries) == 1:
+        return [post_chat(queries[0], timeout=deadline)]
+
+    workers = max(1, min(max_workers, len(queries)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-fanout")
+    try:
+        futures = [pool.submit(post_chat, q, deadline) for q in queries]
+        wait(futures, timeout=deadline * math.ceil(len(queries) / workers))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return [f.result() if f.done() and not f.cancelled() else TIMEOUT_ANSWER for f in futures]
+
+def merge_answers(labels: list[str], answers: list[str]) -> str:
+    parts = [f"### {label}\n\n{answer.strip()}" for label, answer in zip(labels, answers)]
+    return "\n\n---\n\n".join(parts)
@@ -0,0 +1,67 @@
+destinations = [
+    ("Ha Long Bay", "destinations/halong.jpg",
+     "A UNESCO World Natural Heritage site, famous for its thousands of limestone islands rising from emerald waters.",
+     "UNESCO • Nature"),
+    ("Hoi An Ancient Town", "destinations/hoian.jpg",
+     "A well-preserved historic town reflecting a unique blend of Vietnamese, Chinese, and Western architectural influences.",
+     "Heritage • Culture"),
+    ("Da Nang", "destinations/danang.jpg",
+     "A modern coastal city known for its beautiful beaches, iconic bridges, and central role in central Vietnam tourism.",
+     "Coastal • Modern"),
+    ("Ha Giang Loop", "destinations/ha_giang_loop.jpg",
+     "A legendary mountain route offering breathtaking landscapes and rich ethnic minority cultures in northern Vietnam.",
+     "Adventure • Highlands"),
+    ("Hanoi Old Quarter", "destinations/hanoi.jpg",
+     "A historic district over 1,000 years old, capturing the traditional lifestyle and cultural identity of Vietnam’s capital.",
+     "Historic • Citylife"),
+    ("Ho Chi Minh City", "destinations/ho_chi_minh_city.jpg",
+     "Vietnam’s largest economic hub, characterized by its dynamic urban life and historical significance.",
+     "Metropolis • Energy"),
+    ("Hue Imperial City", "destinations/hue.jpg",
+     "The former imperial capital of the Nguyen Dynasty, featuring royal architecture and refined court culture.",
+     "Imperial • UNESCO"),
+    ("Nha Trang", "destinations/nhatrang.jpg",
+     "A popular beach destination known for its long coastline, pleasant climate, and resort activities.",
+     "Beach • Resorts"),
+    ("Phu Quoc Island", "destinations/phuquoc.jpg",
+     "Often referred to as Vietnam’s ‘Pearl Island’, famous for pristine beaches and a rich marine ecosystem.",
+     "Island • Relax"),
+    ("Sa Pa", "destinations/sapa.jpg",
+     "A highland town renowned for terraced rice fields, cool climate, and diverse ethnic cultures.",
+     "Terraces • Cool air"),
+]
+
+foods = [
+    ("Pho", "food/pho.jpg",
+     "Vietnam’s most iconic dish, featuring a clear and aromatic broth with rice noodles and tender meat, commonly enjoyed as breakfast.",
+     "Noodle soup • Classic"),
+    ("Banh Mi", "food/banhmi.jpg",
+     "A unique fusion of Vietnamese flavors and Western influences, known worldwide for its convenience and variety.",
+     "Street food • Fusion"),
+    ("Goi Cuon (Fresh Spring Rolls)", "food/goicuon.jpg",
+     "A light and refreshing dish made with shrimp, pork, herbs, and rice noodles, reflecting a healthy eating philosophy.",
+     "Fresh • Healthy"),
+    ("Bun Cha", "food/buncha.jpg",
+     "A Hanoi specialty consisting of grilled pork served with rice noodles and a sweet-sour dipping sauce.",
+     "Hanoi • Grilled"),
+    ("Cao Lau", "food/cao_lau.jpg",
+     "A distinctive noodle dish from Hoi An, influenced by cultural exchanges and closely tied to the town’s trading history.",
+     "Hoi An • Heritage"),
+    ("Com Tam (Broken Rice)", "food/comtam.jpg",
+     "A popular southern Vietnamese dish that reflects everyday life and creativity in traditional cuisine.",
+     "Southern • Comfort"),
+    ("Banh Xeo", "food/banhxeo.jpg",
+     "A savory crispy pancake filled with shrimp and pork, typically enjoyed in family meals and local gatherings.",
+     "Crispy • Savory"),
+]
+
+food_regions = [
+    ("Northern Vietnam", "Light and balanced flavors, emphasizing subtlety and harmony."),
+    ("Central Vietnam", "Bold, spicy, and richly seasoned dishes shaped by harsh natural conditions."),
+    ("Southern Vietnam", "Sweeter and richer flavors with abundant ingredients influenced by river-based culture."),
+]
+
+cities_master = [
+    "Hanoi", "Ha Long", "Ninh Binh", "Sa Pa", "Hue", "Da Nang", "Hoi An",
+    "Nha Trang", "Da Lat", "Ho Chi Minh City", "Mekong Delta", "Phu Quoc"
+]
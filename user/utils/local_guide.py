@@ -0,0 +1,115 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from utils.guide_data import destinations, foods, food_regions, cities_master
+
+LOCAL_MARKER = "📍 *From local guide*"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_LOCAL_SCORE = 1.5
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "is", "are", "was", "it", "its",
+    "what", "whats", "which", "who", "where", "how", "why", "tell", "me", "about", "do", "does", "i", "you",
+    "can", "should", "please", "know", "like", "vietnam", "vietnamese", "s",
+}
+
+# Only plain lookups ("What is cao lau?", "Tell me about Hue") are answered locally
+LOOKUP_RE = re.compile(
+    r"^\s*(what\s+(is|are|was)|what'?s|who\s+(is|was)|tell\s+me\s+(more\s+)?about|describe|info(rmation)?\s+(on|about))\b",
+    re.IGNORECASE,
+)
+
+# Words that describe a place rather than name it ("Ha Long" should find "Ha Long Bay")
+TITLE_FILLER = {"bay", "island", "imperial", "city", "ancient", "town", "old", "quarter", "loop"}
+
+def tokenize(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return [t for t in re.findall(r"[a-z0-9]+", text) if t not in STOPWORDS]
+
+def _title_key(title: str) -> set[str]:
+    head = title.split("(")[0]
+    return {t for t in tokenize(head) if t not in TITLE_FILLER}
+
+def _build_docs() -> list[dict]:
+    docs = []
+    for title, _, desc, vibe in destinations:
+        docs.append({"title": title, "kind": "Destination", "text": desc, "tags": vibe})
+    for title, _, desc, vibe in foods:
+        docs.append({"title": title, "kind": "Dish", "text": desc, "tags": vibe})
+    for region, note in food_regions:
+        docs.append({"title": f"{region} cuisine", "kind": "Regional cuisine", "text": note, "tags": "Food • Region"})
+    return docs
+
+class LocalGuideIndex:
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+        self.postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.doc_len = []
+        for i, d in enumerate(docs):
+            # Titles are weighted twice: they are what users ask about
+            tokens = tokenize(d["title"]) * 2 + tokenize(d["text"]) + tokenize(d["tags"])
+            self.doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((i, tf))
+        self.keys = [_title_key(d["title"]) for d in docs]
+        self.names = [set(tokenize(d["title"])) for d in docs]
+        self.uncovered_cities = [
+            c for c in (_title_key(city) for city in cities_master)
+            if not any(c <= key for key in self.keys)
+        ]
+        self.avg_len = (sum(self.doc_len) / len(self.doc_len)) if self.doc_len else 0.0
+        n = len(docs)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def search(self, query: str, k: int = 3) -> list[tuple[float, int]]:
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self.postings[term]:
+                norm = 1 - BM25_B + BM25_B * self.doc_len[i] / self.avg_len
+                scores[i] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        return sorted(((s, i) for i, s in scores.items()), reverse=True)[:k]
+
+    def format_doc(self, i: int) -> str:
+        d = self.docs[i]
+        return f"**{d['title']}** ({d['kind']}) — {d['text']}\n\n_{d['tags']}_"
+
+    def answer(self, query: str) -> str | None:
+        """Answer a catalog lookup locally, or None when the backend should handle it.
+
+        Only "what is X" / "tell me about X" questions whose remaining words are
+        just the entry's name qualify; anything more specific ("Best food in
+        Hoi An", "Is Sa Pa cold in winter?") goes to the backend.
+        """
+        if not LOOKUP_RE.match(query):
+            return None
+        terms = set(tokenize(query))
+        hits = self.search(query, k=2)
+        if not terms or not hits or hits[0][0] < MIN_LOCAL_SCORE:
+            return None
+        best = hits[0][1]
+        if not self.keys[best] or not self.keys[best] <= terms or not terms <= self.names[best]:
+            return None
+        # A second named entry ("pho or bun cha?") is not a single-entry question
+        if len(hits) > 1 and self.keys[hits[1][1]] and self.keys[hits[1][1]] <= terms:
+            return None
+        # Cities we know by name but hold no facts for must not be answered by a neighbour
+        if any(c <= terms for c in self.uncovered_cities):
+            return None
+        return f"{LOCAL_MARKER}\n\n{self.format_doc(best)}"
+
+    def fallback(self, query: str, k: int = 3) -> str | None:
+        hits = [i for s, i in self.search(query, k=k) if s > 0]
+        if not hits:
+            return None
+        body = "\n\n".join(self.format_doc(i) for i in hits)
+        return f"{LOCAL_MARKER} — the assistant is unavailable, so here is what the built-in guide knows:\n\n{body}"
+
+local_guide = LocalGuideIndex(_build_docs())
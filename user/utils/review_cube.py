@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from utils.review_prep import LEN_COL, RT_COL, DUP_COL, NEAR_DUP_COL
+
+# Length buckets of 10 characters; the last one holds everything from 220 up
+LEN_BUCKET = 10
+LEN_BUCKETS = 23
+
+CUBE_DIMS = ["topic_name", "sentiment", "emotion", "day", "len_bucket", "is_rt", "dup_exact", "dup_near"]
+
+def len_bucket(lengths) -> np.ndarray:
+    return np.minimum(np.asarray(lengths) // LEN_BUCKET, LEN_BUCKETS - 1).astype(np.uint8)
+
+def build_cells(df: pd.DataFrame, time_col: str | None) -> pd.DataFrame:
+    """Tweet counts (and summed text length) per combination of the cube dimensions."""
+    if time_col is not None and pd.api.types.is_datetime64_any_dtype(df[time_col]):
+        day = df[time_col].dt.floor("D")
+    else:
+        day = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+    keys = [
+        df["topic_name"],
+        df["sentiment"],
+        df["emotion"],
+        day.rename("day"),
+        pd.Series(len_bucket(df[LEN_COL]), index=df.index, name="len_bucket"),
+        df[RT_COL].rename("is_rt"),
+        df[DUP_COL].rename("dup_exact"),
+        df[NEAR_DUP_COL].rename("dup_near"),
+    ]
+    cells = df.groupby(keys, observed=True, dropna=False)[LEN_COL].agg(["size", "sum"])
+    cells.columns = ["count", "len_sum"]
+    return cells.reset_index()
+
+class CountCube:
+    """Count cube over the filterable dimensions, materialized once per dataset version.
+
+    Filter selections that map onto cube dimensions (labels, length buckets, RT,
+    day ranges) are answered by slicing the cells, so chart cost depends on the number of
+    distinct cells rather than the number of tweets. Rows whose text is unique in
+    the dataset survive any dedupe, so a deduped selection is the cube slice of
+    those rows plus the (few) duplicated rows that dedupe keeps.
+    """
+
+    def __init__(self, df: pd.DataFrame, time_col: str | None):
+        self.cells = build_cells(df, time_col)
+
+    def slice(self, allowed: dict, min_len: int = 0, exclude_rt: bool = False,
+              window: tuple[pd.Timestamp, pd.Timestamp] | None = None,
+              unique_only: bool | None = None) -> pd.DataFrame:
+        """Cells for a selection, with arguments as in ``FilterIndex.select``.
+
+        ``min_len`` must fall on a bucket boundary (a multiple of ``LEN_BUCKET``)
+        and ``window`` on day boundaries. ``unique_only`` keeps only rows outside
+        exact (False) or near (True) duplicate groups, like a ``fuzzy`` flag.
+        """
+        c = self.cells
+        mask = np.ones(len(c), dtype=bool)
+        for field, values in allowed.items():
+            if values is not None:
+                mask &= c[field].isin(values).to_numpy()
+        if min_len > 0:
+            mask &= c["len_bucket"].to_numpy() >= min_len // LEN_BUCKET
+        if exclude_rt:
+            mask &= ~c["is_rt"].to_numpy(dtype=bool)
+        if window is not None:
+            mask &= ((c["day"] >= window[0]) & (c["day"] < window[1])).to_numpy(dtype=bool)
+        if unique_only is not None:
+            mask &= ~c["dup_near" if unique_only else "dup_exact"].to_numpy(dtype=bool)
+        return c[mask]
+
+def cell_totals(cells: pd.DataFrame, by) -> pd.Series:
+    """Tweet counts grouped by one or more cube dimensions, largest first, empty groups dropped."""
+    s = cells.groupby(by, observed=True)["count"].sum()
+    s = s[s > 0]
+    return s.sort_values(ascending=False, kind="stable") if isinstance(by, str) else s
@@ -0,0 +1,247 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from utils.review_ingest import ReviewFeed, review_feed
+from utils.review_prep import (
+    prepare_frame, compact_frame, memory_report, missing_labels,
+    LEN_COL, RT_COL, HASH_COL, NEAR_COL, DUP_COL, NEAR_DUP_COL,
+)
+from utils.review_index import FilterIndex, TextIndex
+from utils.review_cube import CountCube, build_cells, LEN_BUCKET
+from utils.review_terms import TermMatrix
+from utils.review_duckdb import ReviewWarehouse, PageSet
+from utils.review_timing import span
+from utils.review_schema import (
+    detect_text_column,
+    detect_time_column,
+    detect_user_column,
+    detect_id_column,
+    detect_lang_column,
+    detect_engagement_cols,
+)
+
+# How often the background refresher revalidates against the backend
+REFRESH_SECONDS = float(os.getenv("REVIEWS_REFRESH_SECONDS", "120"))
+# Until a first version is published, a failed build is retried this soon
+FIRST_RETRY_SECONDS = float(os.getenv("REVIEWS_FIRST_RETRY_SECONDS", "5"))
+# How often a running paged download is checked for newly published rows
+LOAD_POLL_SECONDS = 0.25
+
+def _read_only(obj):
+    # Index arrays are shared by every session; make accidental in-place writes fail loudly
+    for value in vars(obj).values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return obj
+
+class ReviewDataset:
+    """One version of the reviews dataset: the prepared frame with its indexes and count cube.
+
+    Built in full before it is published, and never changed afterwards: one copy
+    per process is shared by every session. Readers take ``frame()``, a
+    copy-on-write view, so a write on their side copies only what it touches.
+    The text index and term matrix are built on first use (or by ``warm``).
+    With the DuckDB engine the feed hands over a ``PageSet`` instead of a frame;
+    a ``ReviewWarehouse`` prepares it in SQL and no frame or index is kept.
+    """
+
+    def __init__(self, raw: pd.DataFrame | PageSet, ingest: dict):
+        self.version = ingest.get("version", 0)
+        self.ingest = ingest
+        # Built from the rows of a paged first download that is still running
+        self.partial = bool(ingest.get("partial"))
+        self.as_of = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+        self._text_index = None
+        self._terms = None
+        self.rows = len(raw)
+        self.warehouse = None
+
+        self.text_col = detect_text_column(raw)
+        self.complete = self.text_col is not None
+        self.time_col = detect_time_column(raw)
+        self.user_col = detect_user_column(raw)
+        self.id_col = detect_id_column(raw)
+        self.lang_col = detect_lang_column(raw)
+        self.eng = detect_engagement_cols(raw)
+        self.inferred = []
+        if not self.complete or raw.empty:
+            self.df = raw if isinstance(raw, pd.DataFrame) else pd.DataFrame(columns=raw.columns)
+            self.mem, self.index, self.cube = None, None, None
+            return
+
+        if isinstance(raw, PageSet):
+            with span("dataset.warehouse", rows=len(raw)):
+                self.warehouse = ReviewWarehouse(raw, self.version, self.text_col, self.time_col)
+            # The rows live on disk; only an empty frame (for its schema) stays in memory
+            self.rows, self.inferred, self.mem = self.warehouse.n, self.warehouse.inferred, self.warehouse.mem
+            self.df, self.index, self.cube = self.warehouse.schema, None, None
+            return
+
+        # Label columns the backend did not provide (or not for every row); prepare_frame infers them locally
+        self.inferred = missing_labels(raw)
+        with span("dataset.prepare", rows=len(raw)):
+            df = prepare_frame(raw, self.text_col, self.time_col)
+            df = compact_frame(df, self.text_col, [self.lang_col, self.user_col], list(self.eng.values()))
+        self.df = df
+        self.mem = memory_report(raw, df)
+        with span("dataset.filter_index", rows=len(df)):
+            self.index = _read_only(FilterIndex(df, ["topic_name", "sentiment", "emotion"], LEN_COL, RT_COL, HASH_COL, NEAR_COL, self.time_col))
+        with span("dataset.cube", rows=len(df)):
+            self.cube = CountCube(df, self.time_col)
+
+    def chart_cells(self, ids: np.ndarray, allowed: dict, min_len: int = 0, exclude_rt: bool = False,
+                    window: tuple[pd.Timestamp, pd.Timestamp] | None = None,
+                    dedupe: bool | None = None, searched: bool = False) -> tuple[pd.DataFrame, str]:
+        """Chart cells for the selected (and deduped) rows ``ids``, and how they were computed.
+
+        The other arguments describe the selection as in ``FilterIndex.select``,
+        with ``dedupe`` the ``fuzzy`` flag of ``first_per_text`` (None: no dedupe).
+        Returns ``"cube"`` or ``"cube+dups"`` when the count cube answered, and
+        ``"rows"`` when a text search or a ``min_len`` between length buckets
+        forced aggregating the rows themselves.
+        """
+        if searched or min_len % LEN_BUCKET:
+            return build_cells(self.df.iloc[ids], self.time_col), "rows"
+        cells = self.cube.slice(allowed, min_len, exclude_rt, window, unique_only=dedupe)
+        if dedupe is None:
+            return cells, "cube"
+        grouped = self.df[NEAR_DUP_COL if dedupe else DUP_COL].to_numpy()
+        kept = ids[grouped[ids]]
+        return pd.concat([cells, build_cells(self.df.iloc[kept], self.time_col)], ignore_index=True), "cube+dups"
+
+    def frame(self) -> pd.DataFrame:
+        return self.df.copy(deep=False)
+
+    def text_index(self) -> TextIndex:
+        with self._lock:
+            if self._text_index is None:
+                with span("dataset.text_index", rows=len(self.df)):
+                    self._text_index = _read_only(TextIndex(self.df[self.text_col]))
+            return self._text_index
+
+    def terms(self) -> TermMatrix:
+        with self._lock:
+            if self._terms is None:
+                with span("dataset.terms", rows=len(self.df)):
+                    self._terms = _read_only(TermMatrix(self.df[self.text_col]))
+            return self._terms
+
+    def warm(self):
+        if self.complete and not self.df.empty:
+            self.text_index()
+            self.terms()
+
+class ReviewStore:
+    """Stale-while-revalidate holder of the current ``ReviewDataset``.
+
+    A background thread revalidates the feed every ``REFRESH_SECONDS`` (or when
+    asked) and builds the next version off the request path. Readers keep the
+    version they got until the new one is swapped in with a single assignment.
+    The first version is built by the same thread, so no request ever waits on
+    the backend; ``current()`` is None until it is published. While the feed's
+    paged first download runs, every batch it publishes becomes a partial
+    version, built on this thread as well.
+    """
+
+    def __init__(self, feed: ReviewFeed):
+        self.feed = feed
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._dataset = None
+        self.checked_at = None
+        self.refreshing = False
+        self.last_error = None
+        self.failed_at = None
+        self._requested = 0
+        self._served = 0
+
+    def current(self) -> ReviewDataset | None:
+        """The published dataset, or None while the first version is still being built."""
+        self._start()
+        return self._dataset
+
+    def request_refresh(self) -> int:
+        """Ask for a refresh now; ``refreshed(ticket)`` turns true once one has run after this call."""
+        with self._lock:
+            self._requested += 1
+            ticket = self._requested
+        self._wake.set()
+        self._start()
+        return ticket
+
+    def refreshed(self, ticket: int) -> bool:
+        return self._served >= ticket
+
+    def status(self) -> dict:
+        return {
+            "as_of": self._dataset.as_of if self._dataset else None,
+            "checked_at": self.checked_at,
+            "refreshing": self.refreshing,
+            "error": self.last_error,
+            "failed_at": self.failed_at,
+        }
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="reviews-refresh", daemon=True)
+                self._thread.start()
+
+    def _failed(self, e: Exception):
+        self.last_error = str(e) or type(e).__name__
+        self.failed_at = datetime.now(timezone.utc)
+
+    def _refresh(self, fresh_for: float = 0):
+        with span("dataset.sync"):
+            frame, ingest = self.feed.sync(timeout=15, fresh_for=fresh_for)
+        self.checked_at = datetime.now(timezone.utc)
+        self.last_error = None
+        current = self._dataset
+        if current is None or ingest.get("version") != current.version:
+            dataset = ReviewDataset(frame, ingest)
+            first = current is None or current.partial
+            if not first:
+                dataset.warm()
+            self._dataset = dataset
+            if first:
+                # Nothing (or only part of the data) was on screen before; publish first and build the lazy indexes after
+                threading.Thread(target=dataset.warm, name="reviews-warm", daemon=True).start()
+
+    def _follow_load(self):
+        # Until the paged download is done (or while it waits for ``resume``), publish
+        # each batch the feed publishes; the feed only does so when the rows have doubled
+        while self.feed.ensure_loaded():
+            raw, ingest = self.feed.snapshot()
+            current = self._dataset
+            if not raw.empty and ingest.get("partial") and (current is None or ingest.get("version") != current.version):
+                self._dataset = ReviewDataset(raw, ingest)
+            time.sleep(LOAD_POLL_SECONDS)
+
+    def _run(self):
+        first = True
+        while True:
+            if not first:
+                self._wake.wait(REFRESH_SECONDS if self._dataset is not None else FIRST_RETRY_SECONDS)
+            first = False
+            self._wake.clear()
+            with self._lock:
+                serving = self._requested
+            self.refreshing = True
+            try:
+                self._follow_load()
+                # The first full build reuses the rows the feed already holds when they are recent
+                self._refresh(fresh_for=REFRESH_SECONDS if self._dataset is None or self._dataset.partial else 0)
+            except Exception as e:
+                self._failed(e)
+            finally:
+                self.refreshing = False
+                self._served = serving
+
+review_store = ReviewStore(review_feed)
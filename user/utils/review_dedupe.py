@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# MinHash signature length and LSH banding: 8 bands of 4 rows puts the
+# candidate threshold around 0.6 Jaccard similarity
+NUM_HASHES = 32
+BANDS = 8
+NEAR_DUP_MIN_SIMILARITY = 0.6
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+_rng = np.random.default_rng(0x5EED)
+_SEEDS = _rng.integers(0, 2**63, size=NUM_HASHES, dtype=np.uint64)
+_MULTS = _rng.integers(0, 2**63, size=NUM_HASHES, dtype=np.uint64) | np.uint64(1)
+
+def normalize_text(text: pd.Series) -> pd.Series:
+    """Lowercase, drop links and a leading ``RT @user:`` and collapse whitespace."""
+    x = text.str.lower()
+    x = x.str.replace(r"^\s*rt\s+@\w+:?", "", regex=True)
+    x = x.str.replace(r"https?://\S+", "", regex=True)
+    return x.str.replace(r"\s+", " ", regex=True).str.strip()
+
+def text_fingerprint(norm: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(norm, index=False).to_numpy()
+
+def _shingles(norm: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    # Adjacent word pairs; a one-word text is its own shingle
+    words = norm.reset_index(drop=True).str.findall(r"\w+").explode().dropna()
+    if words.empty:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+    docs = words.index.to_numpy(dtype=np.int64)
+    h = pd.util.hash_pandas_object(words, index=False).to_numpy()
+    same = docs[1:] == docs[:-1]
+    with np.errstate(over="ignore"):
+        pairs = (h[:-1] * np.uint64(0x9E3779B97F4A7C15)) ^ h[1:]
+    single = np.ones(len(docs), dtype=bool)
+    single[1:] &= ~same
+    single[:-1] &= ~same
+    return np.concatenate([docs[:-1][same], docs[single]]), np.concatenate([pairs[same], h[single]])
+
+def minhash_signatures(norm: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """MinHash signature per row, plus a mask of the rows that had any words."""
+    n = len(norm)
+    docs, shingles = _shingles(norm)
+    sig = np.full((n, NUM_HASHES), _MASK64, dtype=np.uint64)
+    if docs.size == 0:
+        return sig, np.zeros(n, dtype=bool)
+    order = np.argsort(docs, kind="stable")
+    docs, shingles = docs[order], shingles[order]
+    starts = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+    rows = docs[starts]
+    with np.errstate(over="ignore"):
+        for k in range(NUM_HASHES):
+            vals = (shingles ^ _SEEDS[k]) * _MULTS[k]
+            sig[rows, k] = np.minimum.reduceat(vals, starts)
+    has_words = np.zeros(n, dtype=bool)
+    has_words[rows] = True
+    return sig, has_words
+
+def _components(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    labels = np.arange(n)
+    while True:
+        m = np.minimum(labels[u], labels[v])
+        before = labels.copy()
+        np.minimum.at(labels, u, m)
+        np.minimum.at(labels, v, m)
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+def near_duplicate_clusters(sig: np.ndarray, has_words: np.ndarray) -> np.ndarray:
+    """Cluster id per row (the smallest row position in its cluster).
+
+    Rows sharing an LSH band become candidates; a candidate is linked to the
+    first row of its band bucket only when their signatures agree on at least
+    ``NEAR_DUP_MIN_SIMILARITY`` of the hashes, which keeps chance collisions
+    from chaining unrelated tweets together.
+    """
+    n = len(sig)
+    rows = np.flatnonzero(has_words)
+    if rows.size < 2:
+        return np.arange(n)
+    width = NUM_HASHES // BANDS
+    us, vs = [], []
+    for b in range(BANDS):
+        band = pd.DataFrame(sig[rows, b * width:(b + 1) * width])
+        bucket, _ = pd.factorize(pd.util.hash_pandas_object(band, index=False).to_numpy())
+        _, first = np.unique(bucket, return_index=True)
+        rep = rows[first[bucket]]
+        cand = rep != rows
+        u, v = rows[cand], rep[cand]
+        agree = (sig[u] == sig[v]).mean(axis=1) >= NEAR_DUP_MIN_SIMILARITY
+        us.append(u[agree])
+        vs.append(v[agree])
+    return _components(n, np.concatenate(us), np.concatenate(vs))
@@ -0,0 +1,493 @@
+import os
+import re
+import tempfile
+import threading
+import weakref
+
+import pandas as pd
+
+from utils.review_prep import LEN_COL, RT_COL, HASH_COL, NEAR_COL, DUP_COL, NEAR_DUP_COL, LABEL_COLS
+from utils.review_cube import LEN_BUCKET, LEN_BUCKETS
+from utils.review_dedupe import NUM_HASHES, BANDS, NEAR_DUP_MIN_SIMILARITY, _SEEDS
+from utils.review_labeling import VOCAB, WEIGHTS, EMOTION_CLASSES, TOPIC_CLASSES
+from utils.review_schema import detect_time_column
+from utils.review_terms import STOPWORDS, TERM_RE, WORD_RE
+
+try:
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    duckdb = None
+
+# Opt-in: REVIEWS_ENGINE=duckdb spools fetched pages to Parquet, prepares each dataset version in SQL and answers the dashboard from it
+DUCKDB_ENABLED = duckdb is not None and os.getenv("REVIEWS_ENGINE", "memory") == "duckdb"
+DUCKDB_DIR = os.getenv("REVIEWS_DUCKDB_DIR") or os.path.join(tempfile.gettempdir(), "reviews-duckdb")
+DUCKDB_MEMORY_LIMIT = os.getenv("REVIEWS_DUCKDB_MEMORY", "1GB")
+# Rows per Parquet row group of a prepared version
+DUCKDB_ROW_GROUP = 122_880
+# Rows pulled into Python for the Data table when "All" is picked; exports are written by DuckDB and not capped
+DUCKDB_ROW_CAP = 10_000
+# COPY options per dashboard export format
+COPY_OPTIONS = {
+    "CSV": "FORMAT csv, HEADER",
+    "CSV (gzip)": "FORMAT csv, HEADER, COMPRESSION gzip",
+    "Parquet": "FORMAT parquet, COMPRESSION zstd",
+}
+
+ROW_COL = "_row"
+LABEL_FIELDS = ["topic_name", "sentiment", "emotion"]
+
+# A non-word character for the TextIndex tokenizer (\w+), in RE2 syntax
+_NOT_WORD = r"[^\pL\pN_]"
+
+def _ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def search_pattern(query: str) -> str | None:
+    """RE2 pattern matching ``query`` like ``TextIndex.search`` (word prefix or phrase), or None for a substring scan."""
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    return f"(^|{_NOT_WORD})" + f"{_NOT_WORD}+".join(re.escape(w) for w in words)
+
+class Page:
+    """One fetched page, written to its own Parquet file as soon as it arrives.
+
+    The file is removed once no ``PageSet`` refers to the page any more.
+    """
+
+    def __init__(self, batch: pd.DataFrame, gen: int = 0):
+        os.makedirs(DUCKDB_DIR, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="page-", suffix=".parquet", dir=DUCKDB_DIR)
+        os.close(fd)
+        weakref.finalize(self, _remove, self.path)
+        table = pa.Table.from_pandas(batch, preserve_index=False)
+        # A column that is null throughout the page has no type; string unifies with any other page's type
+        table = table.cast(pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]))
+        pq.write_table(table, self.path, compression="zstd")
+
+        self.gen = gen
+        self.rows = len(batch)
+        self.columns = list(batch.columns)
+        self.nbytes = int(batch.memory_usage(deep=True).sum())
+        time_col = detect_time_column(batch)
+        self.latest = pd.to_datetime(batch[time_col], errors="coerce", utc=True).max() if time_col and len(batch) else pd.NaT
+
+class PageSet:
+    """The raw rows under the DuckDB engine: the fetched pages, in order, in place of a frame.
+
+    Pages of a later generation are deltas: their rows replace earlier rows with
+    the same ``id_col`` value, and ``deleted`` (id, generation) pairs drop earlier
+    rows, as ``merge_delta`` does. ``len`` counts the rows as fetched.
+    """
+
+    def __init__(self, pages=(), id_col: str | None = None, deleted=()):
+        self.pages = tuple(pages)
+        self.id_col = id_col
+        self.deleted = tuple(deleted)
+        self.columns = pd.Index(list(dict.fromkeys(c for p in self.pages for c in p.columns)))
+        self.nbytes = sum(p.nbytes for p in self.pages)
+        self.latest = max((p.latest for p in self.pages if pd.notna(p.latest)), default=pd.NaT)
+
+    def __len__(self) -> int:
+        return sum(p.rows for p in self.pages)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def with_delta(self, delta: pd.DataFrame, id_col: str | None, deleted: list) -> "PageSet":
+        gen = max((p.gen for p in self.pages), default=0) + 1
+        pages = self.pages + ((Page(delta, gen),) if not delta.empty else ())
+        return PageSet(pages, id_col, self.deleted + tuple((str(i), gen) for i in deleted))
+
+class Selection:
+    """A filtered view of the warehouse, kept as SQL; only aggregates and capped row sets reach Python."""
+
+    def __init__(self, warehouse: "ReviewWarehouse", sql: str, params: list):
+        self.wh = warehouse
+        self.sql = sql
+        self.params = params
+
+    def _query(self, body: str, params: list = ()) -> pd.DataFrame:
+        return self.wh.query(f"WITH sel AS ({self.sql}) {body}", [*self.params, *params])
+
+    def narrow(self, query: str) -> "Selection":
+        where, params = self.wh.search_clause(query)
+        return Selection(self.wh, f"SELECT * FROM ({self.sql}) WHERE {where}", [*self.params, *params])
+
+    def count(self) -> int:
+        return int(self._query("SELECT count(*) AS n FROM sel")["n"].iloc[0])
+
+    def distinct(self, col: str) -> int:
+        return int(self._query(f"SELECT count(DISTINCT {_ident(col)}) AS n FROM sel")["n"].iloc[0])
+
+    def value_counts(self, col: str) -> pd.Series:
+        out = self._query(f"SELECT {_ident(col)} AS value, count(*) AS count FROM sel GROUP BY ALL ORDER BY count DESC")
+        return out.set_index("value")["count"].rename_axis(col)
+
+    def cells(self) -> pd.DataFrame:
+        """Same layout as ``build_cells``: counts and summed length per cube cell."""
+        day = f"date_trunc('day', {_ident(self.wh.time_col)})" if self.wh.time_col else "NULL::TIMESTAMPTZ"
+        cells = self._query(f"""
+            SELECT topic_name, sentiment, emotion, {day} AS day,
+                   least({LEN_COL} // {LEN_BUCKET}, {LEN_BUCKETS - 1})::UTINYINT AS len_bucket,
+                   {RT_COL} AS is_rt, {DUP_COL} AS dup_exact, {NEAR_DUP_COL} AS dup_near,
+                   count(*) AS count, sum({LEN_COL}) AS len_sum
+            FROM sel GROUP BY ALL
+        """)
+        cells["day"] = pd.to_datetime(cells["day"], utc=True)
+        return cells
+
+    def trend(self, bucket: str) -> pd.Series:
+        """Tweet counts per ``bucket`` (a ``date_trunc`` unit) and sentiment."""
+        t = _ident(self.wh.time_col)
+        out = self._query(f"""
+            SELECT date_trunc('{bucket}', {t}) AS day, sentiment, count(*) AS count
+            FROM sel WHERE {t} IS NOT NULL GROUP BY ALL
+        """)
+        out["day"] = pd.to_datetime(out["day"], utc=True).dt.tz_convert(None)
+        return out.set_index(["day", "sentiment"])["count"]
+
+    def rows(self, limit: int = DUCKDB_ROW_CAP) -> pd.DataFrame:
+        out = self._query(f"SELECT * EXCLUDE ({ROW_COL}) FROM sel ORDER BY {ROW_COL} LIMIT {int(limit)}")
+        return self.wh.restore_types(out)
+
+    def export(self, fmt: str, columns: list, limit: int | None = None) -> bytes:
+        """The selection's ``columns`` (its first ``limit`` rows, or all) as a file in ``fmt``.
+
+        DuckDB streams the rows into the file with ``COPY``; they never pass through pandas.
+        """
+        os.makedirs(DUCKDB_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="export-", dir=DUCKDB_DIR)
+        os.close(fd)
+        cols = ", ".join(_ident(c) for c in columns)
+        cap = f" LIMIT {int(limit)}" if limit is not None else ""
+        try:
+            self.wh.query(f"""
+                COPY (WITH sel AS ({self.sql}) SELECT {cols} FROM sel ORDER BY {ROW_COL}{cap})
+                TO {_literal(path)} ({COPY_OPTIONS[fmt]})
+            """, self.params)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            _remove(path)
+
+    def sample(self, k: int, seed: int) -> pd.DataFrame:
+        out = self._query(f"SELECT * EXCLUDE ({ROW_COL}) FROM sel ORDER BY hash({ROW_COL}, ?) LIMIT {int(k)}", [seed])
+        return self.wh.restore_types(out)
+
+    def stratified(self, col: str, strata: list, k: int, seed: int) -> dict:
+        """Up to ``k`` rows per value of ``strata``, drawn per stratum by a seeded hash order."""
+        out = self._query(f"""
+            SELECT * EXCLUDE ({ROW_COL}) FROM sel WHERE list_contains(?::VARCHAR[], {_ident(col)})
+            QUALIFY row_number() OVER (PARTITION BY {_ident(col)} ORDER BY hash({ROW_COL}, ?)) <= {int(k)}
+        """, [list(strata), seed])
+        out = self.wh.restore_types(out)
+        return {s: out[out[col] == s].reset_index(drop=True) for s in strata}
+
+    def top_terms(self, n: int = 20, bigrams: bool = False, by: str | None = None) -> pd.DataFrame:
+        """Like ``TermMatrix.top``: ``term``/``count``, or one row per term and value of ``by``.
+
+        Bigrams are adjacent words of the original text that are both terms, so a
+        stopword between two terms keeps them apart.
+        """
+        text = _ident(self.wh.text_col)
+        is_term = "(len({0}) >= 3 AND NOT list_contains($stop, {0}))"
+        if bigrams:
+            terms = (f"list_transform(list_filter(range(1, len(w)), i -> {is_term.format('w[i]')} AND {is_term.format('w[i + 1]')}),"
+                     " i -> w[i] || ' ' || w[i + 1])")
+        else:
+            terms = f"list_filter(w, x -> {is_term.format('x')})"
+        grp = _ident(by) if by else "NULL"
+        stop = "[" + ", ".join(_literal(w) for w in sorted(STOPWORDS)) + "]"
+        out = self._query(f"""
+            , words AS (
+                SELECT {grp} AS grp, regexp_extract_all(lower({text}), '{WORD_RE}') AS w FROM sel
+            ), counts AS (
+                SELECT term, grp, count(*) AS count FROM (SELECT grp, unnest({terms.replace('$stop', stop)}) AS term FROM words) GROUP BY ALL
+            ), top AS (
+                SELECT term, sum(count) AS total FROM counts GROUP BY term ORDER BY total DESC, term LIMIT {int(n)}
+            )
+            SELECT term, grp, count, total FROM counts JOIN top USING (term) ORDER BY total DESC, term
+        """)
+        if by is None:
+            return out[["term", "total"]].rename(columns={"total": "count"}).drop_duplicates("term").reset_index(drop=True)
+        out = out.rename(columns={"grp": by})[["term", by, "count"]]
+        out[by] = out[by].astype(str)
+        return out.reset_index(drop=True)
+
+def _lexicon() -> pd.DataFrame:
+    # The labeler's weights as a table: sentiment, then one column per emotion and per topic
+    cols = ["s"] + [f"e{i}" for i in range(len(EMOTION_CLASSES))] + [f"t{i}" for i in range(len(TOPIC_CLASSES))]
+    lex = pd.DataFrame(WEIGHTS.astype("float64"), columns=cols)
+    lex.insert(0, "word", VOCAB.astype(str))
+    return lex
+
+def _pick(classes: list, scores: str) -> str:
+    # Like the labeler's argmax: the first best class, or NULL when no word scored
+    names = "[" + ", ".join(_literal(c) for c in classes) + "]"
+    return f"CASE WHEN list_max({scores}) > 0 THEN {names}[list_position({scores}, list_max({scores}))] END"
+
+class ReviewWarehouse:
+    """One dataset version as a local Parquet file, queried through an embedded DuckDB.
+
+    Built from the raw pages the feed spooled to disk: the delta merge, the
+    derived columns of ``prepare_frame`` (length, RT flag, fingerprints, MinHash
+    near-duplicate clusters, inferred labels) and the compaction all run in SQL,
+    so the dataset is never held in pandas. The page then works on ``Selection``
+    objects: filters and dedupe become SQL, and each chart pulls back only its
+    aggregate. The file is removed when the version is dropped.
+    """
+
+    def __init__(self, pages: PageSet, version: int, text_col: str, time_col: str | None):
+        self.text_col = text_col
+        self.time_col = time_col
+        self.dtypes = {c: "category" for c in LABEL_COLS}
+
+        os.makedirs(DUCKDB_DIR, exist_ok=True)
+        self.path = os.path.join(DUCKDB_DIR, f"reviews-{os.getpid()}-{id(self):x}-v{version}.parquet")
+        weakref.finalize(self, _remove, self.path)
+        self._lock = threading.Lock()
+        self._con = duckdb.connect(config={"memory_limit": DUCKDB_MEMORY_LIMIT, "temp_directory": DUCKDB_DIR})
+        self._con.execute("SET TimeZone = 'UTC'")
+        self.inferred = self._build(pages)
+        self._con.execute(f"CREATE VIEW reviews AS SELECT * FROM read_parquet({_literal(self.path)})")
+        self.n = int(self.query("SELECT count(*) AS n FROM reviews")["n"].iloc[0])
+        self.schema = self.restore_types(self.query(f"SELECT * EXCLUDE ({ROW_COL}) FROM reviews LIMIT 0"))
+        self.mem = self._memory_report(pages)
+
+        # Label values in order of first appearance, as FilterIndex lists them
+        self._values = {
+            f: self.query(f"SELECT {f} AS v FROM reviews GROUP BY {f} ORDER BY min({ROW_COL})")["v"].tolist()
+            for f in LABEL_FIELDS
+        }
+        self._time_range = None
+        if self.time_col:
+            lo, hi = self.query(f"SELECT min({_ident(self.time_col)}) AS lo, max({_ident(self.time_col)}) AS hi FROM reviews").iloc[0]
+            if pd.notna(lo):
+                self._time_range = (pd.Timestamp(lo).tz_convert("UTC"), pd.Timestamp(hi).tz_convert("UTC"))
+
+    def _build(self, pages: PageSet) -> list:
+        """Write the prepared version to ``self.path``; returns the label columns that had gaps."""
+        con = self._con
+        con.register("page_files", pd.DataFrame({
+            "filename": [p.path for p in pages.pages],
+            "_gen": [p.gen for p in pages.pages],
+            "_seq": range(len(pages.pages)),
+        }))
+        con.register("deleted_ids", pd.DataFrame({
+            "_del_id": pd.Series([i for i, _ in pages.deleted], dtype=object),
+            "_del_gen": pd.Series([g for _, g in pages.deleted], dtype="int64"),
+        }))
+        con.register("lexicon", _lexicon())
+        files = "[" + ", ".join(_literal(p.path) for p in pages.pages) + "]"
+        src = f"read_parquet({files}, union_by_name = true, filename = true, file_row_number = true)"
+        raw_cols = [r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {src}").fetchall()
+                    if r[0] not in ("filename", "file_row_number")]
+        text = _ident(self.text_col)
+
+        merge, dropped = "", "filename, file_row_number, _gen, _seq"
+        if pages.id_col in raw_cols and any(p.gen for p in pages.pages):
+            # For each id the rows of its newest generation win, unless a later delta deleted it
+            key = _ident(pages.id_col)
+            merge = f"""
+                LEFT JOIN (SELECT _del_id, max(_del_gen) AS _del_gen FROM deleted_ids GROUP BY _del_id) d
+                       ON d._del_id = CAST(r.{key} AS VARCHAR)
+                QUALIFY r.{key} IS NULL OR _gen >= greatest(max(_gen) OVER (PARTITION BY r.{key}), coalesce(_del_gen, -1))
+            """
+            dropped += ", _del_id, _del_gen"
+        replace = [f"coalesce(CAST({text} AS VARCHAR), '') AS {text}"]
+        if self.time_col:
+            replace.append(f"TRY_CAST({_ident(self.time_col)} AS TIMESTAMPTZ) AS {_ident(self.time_col)}")
+        # normalize_text: lowercase, no leading "RT @user:", no links, collapsed whitespace
+        norm = rf"""trim(regexp_replace(regexp_replace(regexp_replace(lower({text}),
+                    '^\s*rt\s+@[\pL\pN_]+:?', ''), 'https?://\S+', '', 'g'), '\s+', ' ', 'g'))"""
+        con.execute(rf"""
+            CREATE TEMP TABLE prep AS
+            WITH src AS (
+                SELECT * EXCLUDE ({dropped}) REPLACE ({', '.join(replace)}),
+                       row_number() OVER (ORDER BY _seq, file_row_number) - 1 AS {ROW_COL}
+                FROM (SELECT * FROM {src} AS r JOIN page_files USING (filename) {merge})
+            )
+            SELECT *, length({text}) AS {LEN_COL}, regexp_matches({text}, '(?i)^\s*rt\s+') AS {RT_COL},
+                   hash({norm}) AS {HASH_COL}, {norm} AS _norm
+            FROM src
+        """)
+
+        # Labels: like label_frame, only rows with a gap in some label column are scored
+        present = [c for c in LABEL_COLS if c in raw_cols]
+        nulls = con.execute("SELECT " + ", ".join(["0"] + [f"count(*) FILTER (WHERE {_ident(c)} IS NULL)" for c in present]) + " FROM prep").fetchone()[1:]
+        inferred = [c for c in LABEL_COLS if c not in present or nulls[present.index(c)] > 0]
+        if not inferred or any(c not in present for c in inferred):
+            gap = "TRUE" if inferred else "FALSE"
+        else:
+            gap = " OR ".join(f"{_ident(c)} IS NULL" for c in inferred)
+        emotions = ", ".join(f"sum(e{i})" for i in range(len(EMOTION_CLASSES)))
+        topics = ", ".join(f"sum(t{i})" for i in range(len(TOPIC_CLASSES)))
+        con.execute(f"""
+            CREATE TEMP TABLE scores AS
+            SELECT {ROW_COL}, sum(s) AS s, [{emotions}] AS e, [{topics}] AS t
+            FROM (SELECT {ROW_COL}, unnest(regexp_extract_all(lower({text}), '{TERM_RE}')) AS word FROM prep WHERE {gap})
+            JOIN lexicon USING (word)
+            GROUP BY {ROW_COL}
+        """)
+
+        # MinHash over adjacent word pairs (a one-word text is its own shingle), as minhash_signatures.
+        # Each hash function salts the shingle hash and re-mixes it, so the functions are independent
+        width = NUM_HASHES // BANDS
+        con.execute(rf"""
+            CREATE TEMP TABLE sigs AS
+            SELECT {ROW_COL}, list_transform(range({NUM_HASHES}), k -> list_min(list_transform(hs, h -> hash(xor(h, $seeds[k + 1]))))) AS sig
+            FROM (
+                SELECT {ROW_COL}, list_transform(CASE WHEN len(w) = 1 THEN w ELSE list_transform(range(1, len(w)), i -> w[i] || ' ' || w[i + 1]) END, x -> hash(x)) AS hs
+                FROM (SELECT {ROW_COL}, regexp_extract_all(_norm, '[\pL\pN_]+') AS w FROM prep)
+            )
+            WHERE len(hs) > 0
+        """, {"seeds": [int(x) for x in _SEEDS]})
+        # As near_duplicate_clusters: a row sharing an LSH band bucket links to the bucket's
+        # first row only when enough of their hashes agree
+        con.execute(f"""
+            CREATE TEMP TABLE links AS
+            WITH bands AS (
+                SELECT {ROW_COL}, b, hash(sig[b * {width} + 1:(b + 1) * {width}]) AS key FROM sigs, range({BANDS}) t(b)
+            ), cand AS (
+                SELECT DISTINCT {ROW_COL} AS u, min({ROW_COL}) OVER (PARTITION BY b, key) AS v FROM bands
+            ), edges AS (
+                SELECT u, v FROM cand
+                JOIN sigs su ON su.{ROW_COL} = cand.u
+                JOIN sigs sv ON sv.{ROW_COL} = cand.v
+                WHERE u <> v
+                  AND list_sum(list_transform(range(1, {NUM_HASHES + 1}), i -> (su.sig[i] = sv.sig[i])::INTEGER)) >= {NEAR_DUP_MIN_SIMILARITY * NUM_HASHES}
+            )
+            SELECT u AS a, v AS b FROM edges UNION ALL SELECT v, u FROM edges
+        """)
+        # Connected components by min-label propagation; each cluster is named by its smallest row
+        con.execute("CREATE TEMP TABLE clusters AS SELECT DISTINCT a AS r, a AS c FROM links")
+        while con.execute("""
+            UPDATE clusters SET c = m.c
+            FROM (SELECT l.a AS r, min(k.c) AS c FROM links l JOIN clusters k ON k.r = l.b GROUP BY l.a) m
+            WHERE clusters.r = m.r AND m.c < clusters.c
+        """).fetchone()[0]:
+            pass
+
+        # A label the backend sent wins over the inferred one, row by row
+        given = {c: f"CAST(p.{c} AS VARCHAR), " if c in present else "" for c in LABEL_COLS}
+        guess = "CASE WHEN sc.s > 0 THEN 'positive' WHEN sc.s < 0 THEN 'negative' ELSE 'neutral' END"
+        labels = {
+            # normalize_sentiment
+            "sentiment": f"""CASE lower(trim(coalesce({given['sentiment']}{guess})))
+                                  WHEN 'pos' THEN 'positive' WHEN 'positive' THEN 'positive' WHEN 'positve' THEN 'positive'
+                                  WHEN 'neu' THEN 'neutral' WHEN 'neutral' THEN 'neutral'
+                                  WHEN 'neg' THEN 'negative' WHEN 'negative' THEN 'negative'
+                                  ELSE 'other' END""",
+            "emotion": f"coalesce({given['emotion']}{_pick(EMOTION_CLASSES, 'sc.e')}, 'Unknown')",
+            "topic_name": f"coalesce({given['topic_name']}{_pick(TOPIC_CLASSES, 'sc.t')}, 'Unknown')",
+        }
+        replaced = ", ".join(f"{labels[c]} AS {c}" for c in present)
+        added = "".join(f", {labels[c]} AS {c}" for c in LABEL_COLS if c not in present)
+        con.execute(f"""
+            COPY (
+                SELECT p.* EXCLUDE (_norm){f' REPLACE ({replaced})' if replaced else ''}{added},
+                       coalesce(k.c, p.{ROW_COL})::INTEGER AS {NEAR_COL},
+                       count(*) OVER (PARTITION BY p.{HASH_COL}) > 1 AS {DUP_COL},
+                       count(*) OVER (PARTITION BY coalesce(k.c, p.{ROW_COL})) > 1 AS {NEAR_DUP_COL}
+                FROM prep p
+                LEFT JOIN scores sc ON sc.{ROW_COL} = p.{ROW_COL}
+                LEFT JOIN clusters k ON k.r = p.{ROW_COL}
+                ORDER BY p.{ROW_COL}
+            ) TO {_literal(self.path)} (FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE {DUCKDB_ROW_GROUP})
+        """)
+        for table in ("prep", "scores", "sigs", "links", "clusters"):
+            con.execute(f"DROP TABLE {table}")
+        for view in ("page_files", "deleted_ids", "lexicon"):
+            con.unregister(view)
+        return inferred
+
+    def _memory_report(self, pages: PageSet) -> dict:
+        # Per column: the decoded size against the compressed size on disk
+        meta = pq.ParquetFile(self.path).metadata
+        cols = {}
+        for i in range(meta.num_row_groups):
+            group = meta.row_group(i)
+            for j in range(group.num_columns):
+                c = group.column(j)
+                before, after = cols.get(c.path_in_schema, (0, 0))
+                cols[c.path_in_schema] = (before + c.total_uncompressed_size, after + c.total_compressed_size)
+        return {"before": pages.nbytes, "after": os.path.getsize(self.path), "columns": cols}
+
+    def query(self, sql: str, params: list = ()) -> pd.DataFrame:
+        # One cursor per call: a DuckDB connection must not be shared across threads
+        with self._lock:
+            cur = self._con.cursor()
+        try:
+            return cur.execute(sql, list(params)).df()
+        finally:
+            cur.close()
+
+    def restore_types(self, out: pd.DataFrame) -> pd.DataFrame:
+        for c, t in self.dtypes.items():
+            if c in out.columns:
+                out[c] = out[c].astype(t)
+        return out
+
+    # The widget-facing part of FilterIndex
+    def values(self, field: str) -> list:
+        return list(self._values[field])
+
+    def time_range(self) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        return self._time_range
+
+    def window_count(self, start: pd.Timestamp, end: pd.Timestamp) -> int:
+        t = _ident(self.time_col)
+        return int(self.query(f"SELECT count(*) AS n FROM reviews WHERE {t} >= ? AND {t} < ?", [start, end])["n"].iloc[0])
+
+    def search_clause(self, query: str) -> tuple[str, list]:
+        text = _ident(self.text_col)
+        pattern = search_pattern(query)
+        if pattern is None:
+            return f"contains(lower({text}), ?)", [query.strip().lower()]
+        return f"regexp_matches(lower({text}), ?)", [pattern]
+
+    def select(self, allowed: dict, min_len: int = 0, exclude_rt: bool = False,
+               window: tuple[pd.Timestamp, pd.Timestamp] | None = None, search: str = "",
+               dedupe: bool | None = None) -> Selection:
+        """The rows ``FilterIndex.select`` + search + ``first_per_text`` would give, in row order.
+
+        Nothing is read yet: counts and charts aggregate the whole selection in
+        SQL, and ``Selection.rows`` pulls only the first rows into pandas.
+        """
+        where, params = ["TRUE"], []
+        for field, values in allowed.items():
+            if values is not None:
+                where.append(f"list_contains(?::VARCHAR[], {_ident(field)})")
+                params.append([str(v) for v in values])
+        if min_len > 0:
+            where.append(f"{LEN_COL} >= ?")
+            params.append(int(min_len))
+        if exclude_rt:
+            where.append(f"NOT {RT_COL}")
+        if window is not None and self.time_col:
+            t = _ident(self.time_col)
+            where.append(f"{t} >= ? AND {t} < ?")
+            params += [window[0], window[1]]
+        if search.strip():
+            clause, extra = self.search_clause(search)
+            where.append(clause)
+            params += extra
+
+        sql = f"SELECT * FROM reviews WHERE {' AND '.join(where)}"
+        if dedupe is not None:
+            key = NEAR_COL if dedupe else HASH_COL
+            sql += f" QUALIFY row_number() OVER (PARTITION BY {key} ORDER BY {ROW_COL}) = 1"
+        return Selection(self, sql, params)
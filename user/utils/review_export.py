@@ -0,0 +1,45 @@
+import io
+import gzip
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Rows serialized per step, so peak memory is one chunk rather than the whole text
+EXPORT_CHUNK_ROWS = 50_000
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+}
+if pa is not None:
+    EXPORT_FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+
+def _chunks(df: pd.DataFrame, rows: int):
+    for start in range(0, max(len(df), 1), rows):
+        yield df.iloc[start:start + rows]
+
+def export_frame(df: pd.DataFrame, fmt: str = "CSV", chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "Parquet":
+        # One schema for every chunk, inferred from the whole frame; a chunk on its own
+        # could see a column as all-null. A column null throughout is written as string
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in schema],
+                           metadata=schema.metadata)
+        writer = pq.ParquetWriter(buf, schema, compression="zstd")
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        writer.close()
+        return buf.getvalue()
+
+    out = gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=6) if fmt == "CSV (gzip)" else buf
+    for i, chunk in enumerate(_chunks(df, chunk_rows)):
+        out.write(chunk.to_csv(index=False, header=i == 0).encode("utf-8"))
+    if out is not buf:
+        out.close()
+    return buf.getvalue()
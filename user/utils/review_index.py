@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+DAY_NS = 86_400 * 10**9
+
+class FilterIndex:
+    """Row bitmaps for the dashboard filters, built once per dataset version.
+
+    Every value of each indexed label column maps to a packed bitmap of the rows
+    holding it, and text length and timestamps are kept as sorted indexes. A
+    filter selection is then a handful of bitwise ANDs/ORs over ``n / 8`` bytes,
+    and only the final row ids are handed back to the caller.
+    """
+
+    def __init__(self, df: pd.DataFrame, fields: list[str], len_col: str, rt_col: str, hash_col: str,
+                 near_col: str, time_col: str | None = None):
+        self.n = len(df)
+        self.all = np.packbits(np.ones(self.n, dtype=bool))
+        self.none = np.zeros_like(self.all)
+
+        self.bitmaps: dict[str, dict] = {}
+        for f in fields:
+            codes, uniques = pd.factorize(df[f])
+            self.bitmaps[f] = {u: np.packbits(codes == i) for i, u in enumerate(uniques)}
+
+        lengths = df[len_col].to_numpy()
+        self.len_order = np.argsort(lengths, kind="stable")
+        self.len_sorted = lengths[self.len_order]
+        self.not_rt = np.packbits(~df[rt_col].to_numpy(dtype=bool))
+        self.hashes = df[hash_col].to_numpy()
+        self.clusters = df[near_col].to_numpy()
+
+        # Timestamps sorted once (rows without one are left out), plus per-day cumulative counts
+        self.time_order = np.empty(0, dtype=np.int64)
+        self.time_sorted = np.empty(0, dtype=np.int64)
+        self.day_starts = np.empty(0, dtype=np.int64)
+        self.day_cum = np.zeros(1, dtype=np.int64)
+        if time_col is not None and pd.api.types.is_datetime64_any_dtype(df[time_col]):
+            t = df[time_col]
+            t = t.dt.tz_convert(None) if t.dt.tz is not None else t
+            ns = t.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            valid = np.flatnonzero(t.notna().to_numpy())
+            self.time_order = valid[np.argsort(ns[valid], kind="stable")]
+            self.time_sorted = ns[self.time_order]
+            days = self.time_sorted // DAY_NS * DAY_NS
+            self.day_starts, per_day = np.unique(days, return_counts=True)
+            self.day_cum = np.r_[0, np.cumsum(per_day)]
+
+    def values(self, field: str) -> list:
+        return list(self.bitmaps[field])
+
+    def any_of(self, field: str, values) -> np.ndarray:
+        out = self.none.copy()
+        for v in values:
+            bm = self.bitmaps[field].get(v)
+            if bm is not None:
+                np.bitwise_or(out, bm, out=out)
+        return out
+
+    def time_range(self) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        if self.time_sorted.size == 0:
+            return None
+        return pd.Timestamp(self.time_sorted[0], tz="UTC"), pd.Timestamp(self.time_sorted[-1], tz="UTC")
+
+    def window_count(self, start: pd.Timestamp, end: pd.Timestamp) -> int:
+        """Rows in ``[start, end)`` for day-aligned bounds, from the per-day cumulative counts."""
+        lo, hi = np.searchsorted(self.day_starts, [start.value, end.value], side="left")
+        return int(self.day_cum[hi] - self.day_cum[lo])
+
+    def window(self, start: pd.Timestamp, end: pd.Timestamp) -> np.ndarray:
+        """Ascending row ids in ``[start, end)``: two binary searches and the slice between them."""
+        lo, hi = np.searchsorted(self.time_sorted, [start.value, end.value], side="left")
+        return np.sort(self.time_order[lo:hi])
+
+    def min_length(self, min_len: int) -> np.ndarray:
+        start = np.searchsorted(self.len_sorted, min_len, side="left")
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.len_order[start:]] = True
+        return np.packbits(mask)
+
+    def select(self, allowed: dict, min_len: int = 0, exclude_rt: bool = False,
+               window: tuple[pd.Timestamp, pd.Timestamp] | None = None) -> np.ndarray:
+        """Ascending row ids matching every filter.
+
+        ``allowed`` maps a field to the values to keep; ``None`` leaves the field
+        unfiltered and an empty list matches nothing. ``window`` is a UTC
+        ``[start, end)`` range on the time column.
+        """
+        bm = self.all.copy()
+        for field, values in allowed.items():
+            if values is not None:
+                np.bitwise_and(bm, self.any_of(field, values), out=bm)
+        if min_len > 0:
+            np.bitwise_and(bm, self.min_length(min_len), out=bm)
+        if exclude_rt:
+            np.bitwise_and(bm, self.not_rt, out=bm)
+        if window is not None:
+            # Test only the window's rows against the bitmap instead of unpacking all n bits
+            rows = self.window(*window)
+            return rows[(bm[rows >> 3] >> (7 - (rows & 7)).astype(np.uint8)) & 1 == 1]
+        return np.flatnonzero(np.unpackbits(bm, count=self.n))
+
+    def first_per_text(self, ids: np.ndarray, fuzzy: bool = False) -> np.ndarray:
+        # Like drop_duplicates: the first selected row of each text (or near-duplicate cluster) wins
+        keys = self.clusters[ids] if fuzzy else self.hashes[ids]
+        _, first = np.unique(keys, return_index=True)
+        return ids[np.sort(first)]
+
+TOKEN_RE = r"\w+"
+
+class TextIndex:
+    """Token inverted index over the tweet text, built once per dataset version.
+
+    Postings are stored term by term (CSR layout) with the token position, and
+    the vocabulary is sorted so a prefix is a contiguous range of term ids.
+    Queries are case-insensitive: one word is a prefix match (search-as-you-type),
+    several words are a phrase whose last word may be a prefix.
+    """
+
+    def __init__(self, text: pd.Series):
+        self.n = len(text)
+        self.text = text
+        tokens = text.reset_index(drop=True).str.lower().str.findall(TOKEN_RE).explode().dropna()
+        pos = tokens.groupby(level=0).cumcount().to_numpy()
+        term_ids, vocab = pd.factorize(tokens, sort=True)
+        order = np.argsort(term_ids, kind="stable")
+
+        self.vocab = np.asarray(vocab, dtype=object)
+        self.docs = tokens.index.to_numpy(dtype=np.int32)[order]
+        self.pos = np.minimum(pos, np.iinfo(np.uint16).max).astype(np.uint16)[order]
+        self.ptr = np.concatenate([[0], np.cumsum(np.bincount(term_ids, minlength=len(self.vocab)))])
+
+    def _term_range(self, token: str, prefix: bool) -> tuple[int, int]:
+        lo = int(np.searchsorted(self.vocab, token, side="left"))
+        if not prefix:
+            hit = lo < len(self.vocab) and self.vocab[lo] == token
+            return (lo, lo + 1) if hit else (lo, lo)
+        upper = token[:-1] + chr(ord(token[-1]) + 1)
+        return lo, int(np.searchsorted(self.vocab, upper, side="left"))
+
+    def _postings(self, token: str, prefix: bool) -> tuple[np.ndarray, np.ndarray]:
+        lo, hi = self._term_range(token, prefix)
+        a, b = self.ptr[lo], self.ptr[hi]
+        return self.docs[a:b], self.pos[a:b]
+
+    def search(self, query: str, within: np.ndarray | None = None) -> np.ndarray:
+        """Ascending row ids matching ``query``, optionally restricted to ``within``."""
+        words = pd.Series([query.lower()]).str.findall(TOKEN_RE).iloc[0]
+        if not words:
+            # Nothing indexable (punctuation only): plain substring scan over the candidates
+            rows = np.arange(self.n) if within is None else within
+            hit = self.text.iloc[rows].str.contains(query.strip(), case=False, regex=False, na=False)
+            return rows[hit.to_numpy(dtype=bool)]
+
+        last = len(words) - 1
+        postings = [self._postings(w, prefix=j == last) for j, w in enumerate(words)]
+        if len(words) == 1:
+            docs = postings[0][0]
+        else:
+            # Phrase: narrow to rows holding every word, then keep (row, start)
+            # pairs where word j sits at start + j
+            cand = np.ones(self.n, dtype=bool)
+            for d, _ in postings:
+                present = np.zeros(self.n, dtype=bool)
+                present[d] = True
+                cand &= present
+            starts = None
+            for j, (d, p) in enumerate(postings):
+                keep = cand[d]
+                keys = (d[keep].astype(np.int64) << 16) | p[keep]
+                if j == last:
+                    # An exact term's postings are already in (row, position) order; a prefix spans several terms
+                    keys = np.sort(keys)
+                if starts is None:
+                    starts = keys
+                else:
+                    at = np.minimum(np.searchsorted(keys, starts + j), max(len(keys) - 1, 0))
+                    starts = starts[keys[at] == starts + j] if len(keys) else starts[:0]
+                if starts.size == 0:
+                    break
+            docs = starts >> 16
+
+        hit = np.zeros(self.n, dtype=bool)
+        hit[docs] = True
+        if within is not None:
+            return within[hit[within]]
+        return np.flatnonzero(hit)
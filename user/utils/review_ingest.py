@@ -0,0 +1,373 @@
+import io
+import os
+import time
+import threading
+import tracemalloc
+
+import pandas as pd
+
+from utils.api_client import api_request, decode_payload
+from utils.review_schema import detect_id_column, detect_time_column
+from utils.review_duckdb import DUCKDB_ENABLED, Page, PageSet
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+ARROW_STREAM_MIME = "application/vnd.apache.arrow.stream"
+PARQUET_MIME = "application/vnd.apache.parquet"
+JSON_MIME = "application/json"
+
+# tracemalloc slows decoding noticeably, so peak memory is only measured on request
+TRACE_INGEST_MEMORY = os.getenv("REVIEWS_TRACE_MEMORY", "0") == "1"
+
+TOPICS_PATH = "/fetch/topics"
+
+# Rows per page for the first download; 0 downloads everything in one request
+PAGE_SIZE = int(os.getenv("REVIEWS_PAGE_SIZE", "20000"))
+PAGE_RETRIES = 3
+
+def accept_header() -> str:
+    if pa is None:
+        return JSON_MIME
+    return f"{ARROW_STREAM_MIME}, {PARQUET_MIME};q=0.9, {JSON_MIME};q=0.5"
+
+def decode_reviews(content: bytes, content_type: str) -> tuple[pd.DataFrame, str, int, dict]:
+    """Decode a /fetch/topics body into a frame.
+
+    Returns the frame, the format name, the size of any intermediate Arrow
+    buffers (which tracemalloc cannot see) and the non-row fields of a JSON body.
+    """
+    ctype = content_type.split(";")[0].strip().lower()
+    if pa is not None and ctype == ARROW_STREAM_MIME:
+        with pa.ipc.open_stream(content) as reader:
+            table = reader.read_all()
+        arrow_bytes = table.nbytes
+        return table.to_pandas(split_blocks=True, self_destruct=True), "arrow", arrow_bytes, {}
+    if pa is not None and ctype in {PARQUET_MIME, "application/x-parquet"}:
+        return pd.read_parquet(io.BytesIO(content)), "parquet", 0, {}
+
+    payload = decode_payload(content, content_type)
+    if isinstance(payload, dict):
+        data = payload.get("data", [])
+        meta = {k: v for k, v in payload.items() if k != "data"}
+    else:
+        data, meta = payload, {}
+    return pd.DataFrame(data), ("msgpack" if "msgpack" in ctype else "json"), 0, meta
+
+def _as_int(x) -> int | None:
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return None
+
+def fetch_topics_frame(timeout: float = 15, params: dict | None = None,
+                       headers: dict | None = None) -> tuple[pd.DataFrame, dict]:
+    """Download the reviews dataset, preferring a columnar payload, and report ingest cost.
+
+    A ``304 Not Modified`` answer comes back as an empty frame with ``status`` 304.
+    """
+    accept = accept_header()
+    tracing = TRACE_INGEST_MEMORY and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        status, res_headers, content = api_request("GET", TOPICS_PATH, params=params, timeout=timeout,
+                                                   accept=accept, headers=headers)
+        t1 = time.perf_counter()
+        if status == 304:
+            return pd.DataFrame(), {"status": 304, "download_s": t1 - t0}
+        if status >= 400:
+            return pd.DataFrame(), {"status": status, "error": f"HTTP {status}"}
+
+        try:
+            df, fmt, arrow_bytes, meta = decode_reviews(content, res_headers.get("Content-Type", ""))
+        except Exception:
+            if accept == JSON_MIME:
+                raise
+            # A columnar payload we cannot read: ask again for plain JSON
+            status, res_headers, content = api_request("GET", TOPICS_PATH, params=params, timeout=timeout,
+                                                       accept=JSON_MIME, headers=headers)
+            if status >= 400:
+                return pd.DataFrame(), {"status": status, "error": f"HTTP {status}"}
+            df, fmt, arrow_bytes, meta = decode_reviews(content, res_headers.get("Content-Type", ""))
+        t2 = time.perf_counter()
+        peak = (tracemalloc.get_traced_memory()[1] + arrow_bytes) if tracing else None
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+    info = {
+        "status": status,
+        "format": fmt,
+        "rows": len(df),
+        "payload_bytes": len(content),
+        "download_s": t1 - t0,
+        "decode_s": t2 - t1,
+        "frame_bytes": int(df.memory_usage(deep=True).sum()) if not df.empty else 0,
+        "peak_bytes": peak,
+        "etag": res_headers.get("ETag"),
+        "cursor": res_headers.get("X-Cursor") or meta.get("cursor"),
+        "delta": str(res_headers.get("X-Delta", meta.get("delta", ""))).lower() in {"1", "true"},
+        "delta_supported": str(res_headers.get("X-Delta-Supported", meta.get("delta_supported", ""))).lower() in {"1", "true"},
+        "deleted": meta.get("deleted") or [],
+        "total": _as_int(res_headers.get("X-Total-Count", meta.get("total"))),
+        "next": meta.get("next") or 'rel="next"' in res_headers.get("Link", ""),
+    }
+    return df, info
+
+def merge_delta(base: pd.DataFrame, delta: pd.DataFrame, id_col: str | None, deleted: list) -> pd.DataFrame:
+    """Apply changed/new rows (and deletions) on top of ``base``, keyed by ``id_col``."""
+    if id_col is None or id_col not in base.columns or id_col not in delta.columns:
+        return pd.concat([base, delta], ignore_index=True) if not delta.empty else base
+    gone = set(delta[id_col].tolist()) | set(deleted)
+    if not gone:
+        return base
+    kept = base[~base[id_col].isin(gone)]
+    return pd.concat([kept, delta], ignore_index=True) if not delta.empty else kept.reset_index(drop=True)
+
+def frame_bytes(frame) -> int:
+    if isinstance(frame, PageSet):
+        return frame.nbytes
+    return int(frame.memory_usage(deep=True).sum()) if not frame.empty else 0
+
+class ReviewFeed:
+    """Process-wide copy of the reviews dataset.
+
+    The first download is paged and runs in the background (``ensure_loaded``),
+    so callers can render from the batches received so far. Later syncs send the
+    last ``ETag``, so the backend can answer 304. A ``since`` cursor is only sent
+    once the backend has advertised deltas (a cursor, ``X-Delta-Supported`` or a
+    flagged delta); the changed rows are then merged into the held frame by id.
+    An answer to ``since`` that is not flagged as a delta is ambiguous (a full
+    list, or only the new rows) and leaves the held frame as it is.
+    With the DuckDB engine each fetched page goes straight to a Parquet file and
+    the feed holds a ``PageSet`` of them instead of a frame.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frame = pd.DataFrame()
+        self.etag = None
+        self.cursor = None
+        self.delta_ok = False
+        self.version = 0
+        self.ingest = {}
+        self.synced_at = 0.0
+
+        # Paged first download, filled by a background thread
+        self.loaded = False
+        self.loading = False
+        self.load_error = None
+        self._batches = []
+        self._published = pd.DataFrame()
+        self._next_offset = 0
+        self._total = None
+        self._first_id = None
+
+    def _next_cursor(self, info: dict, frame: pd.DataFrame) -> str | None:
+        if info.get("cursor"):
+            return str(info["cursor"])
+        time_col = detect_time_column(frame)
+        if time_col is None or frame.empty:
+            return self.cursor
+        if isinstance(frame, PageSet):
+            latest = frame.latest
+        else:
+            latest = pd.to_datetime(frame[time_col], errors="coerce", utc=True).max()
+        if pd.isna(latest):
+            return self.cursor
+        previous = pd.to_datetime(self.cursor, errors="coerce", utc=True) if self.cursor else pd.NaT
+        if pd.notna(previous):
+            # A delta may only hold edits to older rows; never move the cursor back
+            latest = max(latest, previous)
+        return latest.isoformat()
+
+    @staticmethod
+    def _advertises_delta(info: dict) -> bool:
+        return bool(info.get("cursor") or info.get("delta_supported") or info.get("delta"))
+
+    def ensure_loaded(self, timeout: float = 15) -> bool:
+        """Start the paged first download in the background if needed.
+
+        Returns True until the full dataset is held (including when a page has
+        failed and the download is waiting for ``resume``). With paging disabled
+        it always returns False and ``sync`` does a one-shot download instead.
+        """
+        with self._lock:
+            if self.loaded or PAGE_SIZE <= 0:
+                return False
+            if not self.loading and self.load_error is None:
+                self.loading = True
+                threading.Thread(target=self._load_pages, args=(timeout,), name="reviews-pages", daemon=True).start()
+            return True
+
+    def resume(self):
+        with self._lock:
+            self.load_error = None
+
+    def progress(self) -> dict:
+        return {"loading": self.loading, "rows": self._next_offset, "total": self._total, "error": self.load_error}
+
+    def snapshot(self) -> tuple[pd.DataFrame, dict]:
+        """The rows held so far and their ingest info; during the paged download, the rows published up to now."""
+        with self._lock:
+            if self.loaded or self._published.empty:
+                return self.frame, self.ingest
+            return self._published, self.ingest
+
+    def _publish(self):
+        # Called with the lock held. Partial frames are only published when the
+        # row count has doubled, so re-preparing them costs O(n) over the whole load
+        if DUCKDB_ENABLED:
+            self._published = PageSet(self._batches)
+        else:
+            self._batches = [pd.concat(self._batches, ignore_index=True)] if len(self._batches) > 1 else self._batches
+            self._published = self._batches[0] if self._batches else pd.DataFrame()
+        self.version += 1
+
+    def _fetch_page(self, offset: int | None, timeout: float) -> tuple[pd.DataFrame, dict]:
+        # A failed page is retried on its own; pages already received are kept.
+        # ``offset=None`` asks for the whole list in one request
+        params = None if offset is None else {"offset": offset, "limit": PAGE_SIZE}
+        delay, error = 0.5, None
+        for attempt in range(PAGE_RETRIES):
+            try:
+                batch, info = fetch_topics_frame(timeout=timeout, params=params)
+                if "error" not in info:
+                    return batch, info
+                error = RuntimeError(info["error"])
+            except Exception as e:
+                error = e
+            if attempt < PAGE_RETRIES - 1:
+                time.sleep(delay)
+                delay *= 2
+        raise error
+
+    def _load_pages(self, timeout: float):
+        totals = {"payload_bytes": 0, "download_s": 0.0, "decode_s": 0.0, "pages": 0}
+        etags = set()
+        try:
+            while True:
+                batch, info = self._fetch_page(self._next_offset, timeout)
+                single = False
+                if self._next_offset == 0 and info.get("total") is None and not info.get("next"):
+                    # No sign of offset/limit support: a shorter or longer answer is the
+                    # whole list; a page-sized one may be cut at ``limit``, so ask once more
+                    if len(batch) == PAGE_SIZE:
+                        totals["pages"] += 1
+                        batch, info = self._fetch_page(None, timeout)
+                    single = True
+                etags.add(info.get("etag"))
+                id_col = detect_id_column(batch)
+                first_id = batch[id_col].iloc[0] if id_col and not batch.empty else None
+                # A backend without paging answers every page with the same full list
+                repeated = self._next_offset > 0 and first_id is not None and first_id == self._first_id
+                with self._lock:
+                    if not repeated and not batch.empty:
+                        self._batches.append(Page(batch) if DUCKDB_ENABLED else batch)
+                        self._next_offset += len(batch)
+                        if self._first_id is None:
+                            self._first_id = first_id
+                    self._total = info.get("total") or self._total
+                    for k in ("payload_bytes", "download_s", "decode_s"):
+                        totals[k] += info.get(k) or 0
+                    totals["pages"] += 1
+
+                done = (
+                    single
+                    or repeated
+                    or len(batch) != PAGE_SIZE
+                    or (self._total is not None and self._next_offset >= self._total)
+                )
+                if done:
+                    with self._lock:
+                        self._publish()
+                        frame = self._published
+                        cursor = self._next_cursor(info, frame)
+                        self.frame, self.cursor = frame, cursor
+                        # Pages of one dataset version share an ETag; mixed ones cannot be revalidated
+                        self.etag = etags.pop() if len(etags) == 1 else None
+                        self.delta_ok = self._advertises_delta(info)
+                        self._batches, self._published = [], pd.DataFrame()
+                        self.ingest = {**info, **totals, "rows": len(frame), "version": self.version,
+                                       "frame_bytes": frame_bytes(frame)}
+                        self.loaded = True
+                        self.synced_at = time.monotonic()
+                    return
+                with self._lock:
+                    if self._next_offset >= 2 * len(self._published):
+                        self._publish()
+                    self.ingest = {**info, **totals, "rows": len(self._published), "version": self.version, "partial": True}
+        except Exception as e:
+            self.load_error = str(e) or type(e).__name__
+        finally:
+            self.loading = False
+
+    def sync(self, full: bool = False, timeout: float = 15, fresh_for: float = 0) -> tuple[pd.DataFrame, dict]:
+        with self._lock:
+            if not full and self.synced_at and time.monotonic() - self.synced_at < fresh_for:
+                return self.frame, self.ingest
+            incremental = not full and not self.frame.empty
+            headers, params = {}, {}
+            if incremental:
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.delta_ok and self.cursor:
+                    params["since"] = self.cursor
+
+            fetched, info = fetch_topics_frame(timeout=timeout, params=params or None, headers=headers or None)
+            if info.get("status") == 304:
+                self.ingest = {**self.ingest, "last_status": 304, "changed_rows": 0}
+                return self.frame, self.ingest
+            if "error" in info:
+                raise RuntimeError(info["error"])
+
+            is_delta = "since" in params
+            if is_delta != info["delta"] and incremental:
+                # Not flagged as the answer we asked for: keep the held frame and
+                # fall back to a full download (no cursor) on the next sync
+                self.delta_ok = False
+                self.ingest = {**self.ingest, "last_status": info["status"], "changed_rows": 0, "ambiguous": True}
+                return self.frame, self.ingest
+
+            if is_delta and isinstance(self.frame, PageSet):
+                frame = self.frame.with_delta(fetched, detect_id_column(self.frame), info["deleted"])
+            elif is_delta:
+                frame = merge_delta(self.frame, fetched, detect_id_column(self.frame), info["deleted"])
+            else:
+                frame = PageSet([Page(fetched)]) if DUCKDB_ENABLED and not fetched.empty else fetched
+            # Everything that can fail is computed before the feed changes
+            cursor = self._next_cursor(info, fetched if is_delta else frame)
+            etag = info.get("etag")
+
+            self.frame, self.cursor, self.etag = frame, cursor, etag
+            self.delta_ok = self._advertises_delta(info)
+            self.loaded = True
+            self.synced_at = time.monotonic()
+            self.version += 1
+            self.ingest = {**info, "last_status": info["status"], "changed_rows": len(fetched),
+                           "rows_total": len(frame), "incremental": is_delta, "version": self.version}
+            return self.frame, self.ingest
+
+review_feed = ReviewFeed()
+
+def describe_ingest(info: dict) -> str:
+    if not info or "format" not in info:
+        return ""
+    peak = f"{info['peak_bytes'] / 2**20:,.1f} MB" if info.get("peak_bytes") is not None else "n/a"
+    text = (
+        f"Ingest: {info['format']} · {info['rows']:,} rows · {info['payload_bytes'] / 2**20:,.1f} MB payload · "
+        f"download {info['download_s'] * 1000:,.0f} ms · decode {info['decode_s'] * 1000:,.0f} ms · "
+        f"frame {info['frame_bytes'] / 2**20:,.1f} MB · peak {peak}"
+    )
+    if info.get("pages"):
+        text += f" · {info['pages']} pages"
+    if info.get("last_status") == 304:
+        text += " · last refresh: not modified"
+    elif info.get("incremental"):
+        text += f" · last refresh: {info['changed_rows']:,} changed rows merged ({info['rows_total']:,} total)"
+    return text
@@ -0,0 +1,146 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.review_terms import TERM_RE
+
+# Rows per batch handed to a worker process; smaller inputs are scored inline
+LABEL_CHUNK_ROWS = 100_000
+LABEL_WORKERS = int(os.getenv("REVIEWS_LABEL_WORKERS", "0")) or os.cpu_count() or 1
+# Labels remembered across dataset versions, keyed by text hash
+LABEL_CACHE_MAX = 5_000_000
+
+SENTIMENT_WORDS = {
+    "positive": [
+        "good", "great", "amazing", "awesome", "beautiful", "best", "love", "loved", "lovely", "nice", "friendly",
+        "delicious", "tasty", "cheap", "clean", "fantastic", "wonderful", "perfect", "happy", "enjoy", "enjoyed",
+        "recommend", "excellent", "fun", "stunning", "helpful", "easy", "fresh", "worth", "incredible", "favorite",
+    ],
+    "negative": [
+        "bad", "terrible", "awful", "worst", "hate", "dirty", "expensive", "scam", "scammed", "crowded", "rude",
+        "noisy", "slow", "late", "delay", "delayed", "cancelled", "problem", "poor", "overpriced", "disappointed",
+        "disappointing", "unsafe", "stolen", "sick", "boring", "horrible", "annoying", "broken", "rain", "lost",
+    ],
+}
+EMOTION_WORDS = {
+    "joy": ["happy", "love", "loved", "amazing", "awesome", "enjoy", "enjoyed", "fun", "wonderful", "beautiful", "great", "excited"],
+    "anger": ["angry", "hate", "scam", "scammed", "rude", "furious", "annoying", "ripped", "overpriced", "cheated", "worst"],
+    "sadness": ["sad", "miss", "missed", "disappointed", "disappointing", "lonely", "cry", "sorry", "unfortunately", "rain", "lost"],
+    "fear": ["scared", "afraid", "fear", "dangerous", "unsafe", "worried", "nervous", "crazy", "traffic", "stolen", "accident"],
+    "surprise": ["wow", "surprised", "surprising", "unexpected", "incredible", "unbelievable", "shocked", "finally", "suddenly"],
+}
+TOPIC_WORDS = {
+    "Food": ["food", "pho", "banh", "coffee", "eat", "ate", "restaurant", "noodle", "noodles", "street", "market", "delicious", "tasty", "dinner", "lunch", "breakfast"],
+    "Transport": ["taxi", "grab", "bus", "train", "motorbike", "traffic", "flight", "airport", "boat", "ride", "driver", "scooter", "bike"],
+    "Beaches": ["beach", "beaches", "bay", "sea", "island", "islands", "swim", "sand", "ocean", "coast", "nha", "trang", "quoc"],
+    "Culture": ["citadel", "temple", "pagoda", "museum", "history", "culture", "hue", "hoi", "ancient", "tour", "sapa", "terraces", "trek", "rice"],
+    "Accommodation": ["hotel", "hostel", "room", "stay", "stayed", "homestay", "resort", "booking", "airbnb", "bed", "night"],
+    "Visa": ["visa", "evisa", "passport", "immigration", "embassy", "border", "entry", "extension", "permit"],
+}
+
+def _weights() -> tuple[pd.Index, np.ndarray, list, list, list]:
+    # One column per class: sentiment (+1/-1 in one column), then emotions, then topics
+    emotions, topics = list(EMOTION_WORDS), list(TOPIC_WORDS)
+    lexicons = [*SENTIMENT_WORDS.values(), *EMOTION_WORDS.values(), *TOPIC_WORDS.values()]
+    vocab = pd.Index(sorted({w for words in lexicons for w in words}))
+    W = np.zeros((len(vocab), 1 + len(emotions) + len(topics)), dtype=np.float32)
+    W[vocab.get_indexer(SENTIMENT_WORDS["positive"]), 0] += 1
+    W[vocab.get_indexer(SENTIMENT_WORDS["negative"]), 0] -= 1
+    for j, words in enumerate(list(EMOTION_WORDS.values()) + list(TOPIC_WORDS.values()), start=1):
+        W[vocab.get_indexer(words), j] = 1
+    return vocab, W, ["negative", "neutral", "positive"], emotions, topics
+
+VOCAB, WEIGHTS, SENTIMENT_CLASSES, EMOTION_CLASSES, TOPIC_CLASSES = _weights()
+
+def score_texts(texts) -> np.ndarray:
+    """Label codes for each text as an ``(n, 3)`` int8 array: sentiment, emotion, topic.
+
+    Sentiment is ``0/1/2`` for negative/neutral/positive; emotion and topic are
+    indexes into their class lists, or ``-1`` when no lexicon word matches.
+    """
+    text = pd.Series(texts, dtype=object).reset_index(drop=True)
+    n = len(text)
+    tokens = text.fillna("").astype(str).str.lower().str.findall(TERM_RE).explode().dropna()
+    ids = VOCAB.get_indexer(tokens)
+    hit = ids >= 0
+    docs = tokens.index.to_numpy(dtype=np.int64)[hit]
+    rows = WEIGHTS[ids[hit]]
+    scores = np.column_stack([np.bincount(docs, weights=rows[:, j], minlength=n) for j in range(WEIGHTS.shape[1])]) if n else np.zeros((0, WEIGHTS.shape[1]))
+
+    out = np.empty((n, 3), dtype=np.int8)
+    out[:, 0] = np.sign(scores[:, 0]).astype(np.int8) + 1
+    for k, cols in ((1, slice(1, 1 + len(EMOTION_CLASSES))), (2, slice(1 + len(EMOTION_CLASSES), None))):
+        block = scores[:, cols]
+        best = block.argmax(axis=1) if n else np.zeros(0, dtype=np.int64)
+        out[:, k] = np.where(block.max(axis=1, initial=0) > 0, best, -1)
+    return out
+
+class LabelCache:
+    """Label codes by text hash, shared by every dataset version in the process.
+
+    Kept as sorted hash/code arrays so a lookup for a whole frame is one
+    ``searchsorted``; a refresh only scores texts that were never seen.
+    """
+
+    def __init__(self, max_entries: int = LABEL_CACHE_MAX):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.codes = np.empty((0, 3), dtype=np.int8)
+
+    def lookup(self, hashes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            keys, codes = self.keys, self.codes
+        pos = np.minimum(np.searchsorted(keys, hashes), max(len(keys) - 1, 0))
+        found = keys[pos] == hashes if len(keys) else np.zeros(len(hashes), dtype=bool)
+        out = np.full((len(hashes), 3), -1, dtype=np.int8)
+        out[found] = codes[pos[found]]
+        return out, found
+
+    def add(self, hashes: np.ndarray, codes: np.ndarray):
+        with self._lock:
+            if len(self.keys) + len(hashes) > self.max_entries:
+                self.keys, self.codes = self.keys[:0], self.codes[:0]
+            keys = np.concatenate([self.keys, hashes])
+            uniq, first = np.unique(keys, return_index=True)
+            self.keys = uniq
+            self.codes = np.concatenate([self.codes, codes])[first]
+
+label_cache = LabelCache()
+
+def _score_batches(texts: pd.Series) -> np.ndarray:
+    batches = [texts.iloc[i:i + LABEL_CHUNK_ROWS].tolist() for i in range(0, len(texts), LABEL_CHUNK_ROWS)]
+    if LABEL_WORKERS <= 1 or len(batches) <= 1:
+        return np.concatenate([score_texts(b) for b in batches]) if batches else np.empty((0, 3), dtype=np.int8)
+    # Spawned, not forked: the Streamlit server is multithreaded and a forked child could inherit a held lock
+    with ProcessPoolExecutor(max_workers=min(LABEL_WORKERS, len(batches)), mp_context=multiprocessing.get_context("spawn")) as pool:
+        return np.concatenate(list(pool.map(score_texts, batches)))
+
+def label_frame(text: pd.Series, hashes: np.ndarray, cache: LabelCache = label_cache) -> pd.DataFrame:
+    """Locally inferred ``sentiment``, ``emotion`` and ``topic_name`` for each row of ``text``.
+
+    ``hashes`` identify the texts (the normalized-text fingerprint); each
+    distinct text is scored once, and texts already in ``cache`` are not
+    scored again.
+    """
+    uniq, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    codes, found = cache.lookup(uniq)
+    if not found.all():
+        todo = np.flatnonzero(~found)
+        codes[todo] = _score_batches(text.iloc[first[todo]])
+        cache.add(uniq[todo], codes[todo])
+    codes = codes[inverse]
+
+    def pick(classes, col):
+        labels = np.array(list(classes) + [None], dtype=object)
+        return labels[np.where(col >= 0, col, len(classes))]
+
+    return pd.DataFrame({
+        "sentiment": pick(SENTIMENT_CLASSES, codes[:, 0]),
+        "emotion": pick(EMOTION_CLASSES, codes[:, 1]),
+        "topic_name": pick(TOPIC_CLASSES, codes[:, 2]),
+    }, index=text.index)
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from utils.review_dedupe import normalize_text, text_fingerprint, minhash_signatures, near_duplicate_clusters
+from utils.review_labeling import label_frame
+from utils.review_timing import span
+
+try:
+    import pyarrow  # noqa: F401  (enables Arrow-backed strings)
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    TEXT_DTYPE = None
+
+SENTIMENTS = ["positive", "neutral", "negative", "other"]
+
+# Helper columns added at prepare time; the underscore keeps them out of the Data tab
+LEN_COL = "_text_len"
+RT_COL = "_is_rt"
+HASH_COL = "_text_hash"
+NEAR_COL = "_near_dup"
+# Rows whose text (or near-duplicate cluster) occurs more than once in the dataset
+DUP_COL = "_in_dup_group"
+NEAR_DUP_COL = "_in_near_group"
+HELPER_COLS = [LEN_COL, RT_COL, HASH_COL, NEAR_COL, DUP_COL, NEAR_DUP_COL]
+
+LABEL_COLS = ["sentiment", "topic_name", "emotion"]
+# Other columns become categorical when they repeat at least this much
+CATEGORY_MAX_RATIO = 0.5
+
+def normalize_sentiment(s) -> str:
+    x = str(s).strip().lower()
+    if x in {"pos", "positive", "positve"}:
+        return "positive"
+    if x in {"neu", "neutral"}:
+        return "neutral"
+    if x in {"neg", "negative"}:
+        return "negative"
+    return "other"
+
+def normalize_sentiment_series(s: pd.Series) -> pd.Series:
+    # Only the distinct raw labels go through Python; rows are mapped by code
+    codes, uniques = pd.factorize(s)
+    labels = np.array([normalize_sentiment(u) for u in uniques] + ["other"], dtype=object)
+    return pd.Series(labels[codes], index=s.index, name=s.name)
+
+def missing_labels(df: pd.DataFrame) -> list:
+    # Label columns absent, or missing on at least one row
+    return [c for c in LABEL_COLS if c not in df.columns or df[c].isna().any()]
+
+def to_dt(series: pd.Series) -> pd.Series:
+    x = pd.to_datetime(series, errors="coerce", utc=True)
+    if x.notna().any():
+        return x
+    return pd.to_datetime(series.astype(str), errors="coerce", utc=True)
+
+def prepare_frame(raw: pd.DataFrame, text_col: str, time_col: str | None) -> pd.DataFrame:
+    """Normalize labels, text and timestamps once and add the helper columns filters use.
+
+    Labels the backend did not send (a whole column, or single rows) are filled
+    by the local labeler, keyed by the text fingerprint; labels it did send are kept.
+    """
+    df = raw.copy(deep=False)
+    text = df[text_col].fillna("").astype(str)
+    df[text_col] = text
+    if time_col is not None:
+        df[time_col] = to_dt(df[time_col])
+
+    df[LEN_COL] = text.str.len()
+    df[RT_COL] = text.str.match(r"^\s*rt\s+@?", case=False, na=False)
+    norm = normalize_text(text)
+    df[HASH_COL] = text_fingerprint(norm)
+    df[NEAR_COL] = near_duplicate_clusters(*minhash_signatures(norm)).astype(np.int32)
+    df[DUP_COL] = df[HASH_COL].duplicated(keep=False)
+    df[NEAR_DUP_COL] = df[NEAR_COL].duplicated(keep=False)
+
+    missing = missing_labels(df)
+    if missing:
+        holes = {c: df[c].isna().to_numpy() if c in df.columns else np.ones(len(df), dtype=bool) for c in missing}
+        # Only rows with a gap in some column are labeled
+        rows = np.flatnonzero(np.logical_or.reduce(list(holes.values())))
+        with span("dataset.label", rows=len(rows), columns=",".join(missing)):
+            inferred = label_frame(text.iloc[rows], df[HASH_COL].to_numpy()[rows])
+        for c in missing:
+            values = df[c].to_numpy(dtype=object) if c in df.columns else np.full(len(df), None, dtype=object)
+            values = values.copy()
+            fill = holes[c][rows]
+            values[rows[fill]] = inferred[c].to_numpy()[fill]
+            df[c] = values
+    df["sentiment"] = normalize_sentiment_series(df["sentiment"])
+    df["topic_name"] = df["topic_name"].fillna("Unknown").astype(str)
+    df["emotion"] = df["emotion"].fillna("Unknown").astype(str)
+    return df
+
+def _as_arrow_text(s: pd.Series) -> pd.Series:
+    if TEXT_DTYPE is None:
+        return s
+    if isinstance(s.dtype, pd.StringDtype) and s.dtype.storage == "pyarrow":
+        return s
+    return s.astype(TEXT_DTYPE)
+
+def _downcast_count(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast="unsigned" if (s >= 0).all() else "integer")
+    if pd.api.types.is_float_dtype(s):
+        if s.notna().all() and (s % 1 == 0).all():
+            return _downcast_count(s.astype("int64"))
+        return s.astype("float32")
+    return s
+
+def compact_frame(df: pd.DataFrame, text_col: str, other_label_cols: list, count_cols: list) -> pd.DataFrame:
+    """Shrink the prepared frame: categoricals for labels, Arrow strings for text, small ints for counts."""
+    n = max(len(df), 1)
+    for c in LABEL_COLS:
+        df[c] = df[c].astype("category")
+    for c in other_label_cols:
+        if c and c in df.columns and df[c].nunique(dropna=False) / n <= CATEGORY_MAX_RATIO:
+            df[c] = df[c].astype("category")
+    df[text_col] = _as_arrow_text(df[text_col])
+    for c in count_cols:
+        if c and c in df.columns:
+            df[c] = _downcast_count(df[c])
+    df[LEN_COL] = pd.to_numeric(df[LEN_COL], downcast="unsigned")
+    return df
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    b = before.memory_usage(deep=True, index=False)
+    a = after.memory_usage(deep=True, index=False)
+    cols = {c: (int(b.get(c, 0)), int(a[c])) for c in after.columns}
+    return {"before": int(b.sum()), "after": int(a.sum()), "columns": cols}
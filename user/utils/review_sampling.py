@@ -0,0 +1,51 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+def _rng(seed: int, *salt: int) -> np.random.Generator:
+    # PCG64 through SeedSequence: the same draws in every process, unlike hash()
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence([seed & 0xFFFFFFFF, *salt])))
+
+def label_salt(label) -> int:
+    return zlib.crc32(str(label).encode("utf-8"))
+
+def sample_positions(n: int, k: int, seed: int, *salt: int) -> np.ndarray:
+    """``k`` distinct positions out of ``range(n)`` in random order, in O(k) (Floyd's algorithm)."""
+    k = max(0, min(k, n))
+    rng = _rng(seed, *salt)
+    chosen = set()
+    for j in range(n - k, n):
+        t = int(rng.integers(0, j + 1))
+        chosen.add(j if t in chosen else t)
+    return rng.permutation(np.fromiter(chosen, dtype=np.int64, count=k))
+
+def sample_rows(df: pd.DataFrame, k: int, seed: int) -> pd.DataFrame:
+    return df.iloc[sample_positions(len(df), k, seed)].reset_index(drop=True)
+
+def stratified_rows(df: pd.DataFrame, col: str, strata: list, k: int, seed: int) -> dict:
+    """Up to ``k`` rows for each value of ``strata`` in ``col``.
+
+    Rows are bucketed by label once for all strata: a stable argsort of the
+    label codes (a radix sort, linear in the rows, while there are at most
+    65,535 labels) with ``bincount`` offsets marking where each label's
+    ascending positions start. Each stratum then draws its rows by position
+    with a seed salted by the label.
+    """
+    codes, uniques = pd.factorize(df[col])
+    where = {u: i for i, u in enumerate(uniques)}
+    # Shift the missing-value code (-1) to 0 so every code fits an unsigned narrow type
+    keys = (codes + 1).astype(np.min_scalar_type(len(uniques)))
+    order = np.argsort(keys, kind="stable")
+    starts = np.r_[0, np.cumsum(np.bincount(keys, minlength=len(uniques) + 1))]
+
+    out = {}
+    for s in strata:
+        i = where.get(s)
+        if i is None:
+            out[s] = df.iloc[0:0]
+            continue
+        members = order[starts[i + 1]:starts[i + 2]]
+        picks = sample_positions(len(members), k, seed, label_salt(s))
+        out[s] = df.iloc[members[picks]].reset_index(drop=True)
+    return out
@@ -0,0 +1,30 @@
+import pandas as pd
+
+def detect_first_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
+    for c in candidates:
+        if c in df.columns:
+            return c
+    return None
+
+def detect_text_column(df: pd.DataFrame) -> str | None:
+    return detect_first_col(df, ["clean_tweet", "review_text", "vietnam_segment", "text", "content"])
+
+def detect_time_column(df: pd.DataFrame) -> str | None:
+    return detect_first_col(df, ["created_at", "createdAt", "timestamp", "time", "datetime", "date", "posted_at"])
+
+def detect_user_column(df: pd.DataFrame) -> str | None:
+    return detect_first_col(df, ["username", "user", "screen_name", "author", "user_name", "handle"])
+
+def detect_id_column(df: pd.DataFrame) -> str | None:
+    return detect_first_col(df, ["tweet_id", "id", "status_id", "post_id"])
+
+def detect_lang_column(df: pd.DataFrame) -> str | None:
+    return detect_first_col(df, ["lang", "language"])
+
+def detect_engagement_cols(df: pd.DataFrame) -> dict:
+    return {
+        "likes": detect_first_col(df, ["like_count", "likes", "favorite_count", "favourites"]),
+        "retweets": detect_first_col(df, ["retweet_count", "retweets", "repost_count"]),
+        "replies": detect_first_col(df, ["reply_count", "replies"]),
+        "quotes": detect_first_col(df, ["quote_count", "quotes"]),
+    }
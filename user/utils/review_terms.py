@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+STOPWORDS = {
+    "the","and","for","with","that","this","you","your","are","was","were","have","has","had","but","not","from","they","them",
+    "what","when","where","why","how","about","into","out","over","under","just","like","very","really","more","most","less",
+    "its","it's","im","i'm","ive","i've","we","our","us","me","my","mine","their","there","here","than","then","too","also",
+    "in","on","at","to","of","a","an","is","it","as","be","by","or","if","so","do","did","does","can","could","should","would",
+    "rt","via","amp","https","http","co","t","vn","vietnam"
+}
+
+TERM_RE = r"[a-z]{3,}"
+# Every word run, so that short words and stopwords still separate the words around them
+WORD_RE = r"[a-z]+"
+
+class TermMatrix:
+    """Sparse document-term counts for the tweet text, built once per dataset version.
+
+    Each (row, term) occurrence is one entry, for single words and for adjacent
+    word pairs. Stopwords (and words under three letters) are not terms, and a
+    pair is only counted when both words are terms and adjacent in the original
+    text. Top terms for any subset of rows are a masked ``bincount`` over the
+    entries, so no text is tokenized per rerun.
+    """
+
+    def __init__(self, text: pd.Series):
+        self.n = len(text)
+        words = text.reset_index(drop=True).str.lower().str.findall(WORD_RE).explode().dropna()
+        keep = (words.str.len() >= 3) & ~words.isin(STOPWORDS)
+        tokens = words[keep]
+        terms, vocab = pd.factorize(tokens, sort=True)
+
+        self.vocab = np.asarray(vocab, dtype=object)
+        self.docs = tokens.index.to_numpy(dtype=np.int32)
+        self.terms = terms.astype(np.int32)
+
+        # Bigrams: adjacent words of the same tweet, both of them terms
+        seq = np.full(len(words), -1, dtype=np.int64)
+        seq[keep.to_numpy()] = self.terms
+        seq_docs = words.index.to_numpy(dtype=np.int32)
+        ok = (seq_docs[1:] == seq_docs[:-1]) & (seq[:-1] >= 0) & (seq[1:] >= 0)
+        pair_keys = seq[:-1][ok] * len(self.vocab) + seq[1:][ok]
+        pairs, self.pair_keys = pd.factorize(pair_keys)
+        self.pair_docs = seq_docs[:-1][ok]
+        self.pairs = pairs.astype(np.int32)
+
+    def _pair_label(self, k: int) -> str:
+        a, b = divmod(int(self.pair_keys[k]), len(self.vocab))
+        return f"{self.vocab[a]} {self.vocab[b]}"
+
+    def top(self, rows: np.ndarray, n: int = 20, bigrams: bool = False, by: pd.Series | None = None) -> pd.DataFrame:
+        """Most frequent terms over ``rows``.
+
+        Returns ``term``/``count`` columns; with ``by`` (a column aligned with the
+        indexed frame), the top terms are split into one row per value of ``by``.
+        """
+        docs, terms = (self.pair_docs, self.pairs) if bigrams else (self.docs, self.terms)
+        width = len(self.pair_keys) if bigrams else len(self.vocab)
+        selected = np.zeros(self.n, dtype=bool)
+        selected[rows] = True
+        keep = selected[docs]
+        docs, terms = docs[keep], terms[keep]
+
+        totals = np.bincount(terms, minlength=width)
+        order = np.argsort(-totals, kind="stable")[:n]
+        order = order[totals[order] > 0]
+        labels = [self._pair_label(k) for k in order] if bigrams else self.vocab[order].tolist()
+        if by is None:
+            return pd.DataFrame({"term": labels, "count": totals[order]})
+
+        codes, values = pd.factorize(by)
+        group = codes[docs].astype(np.int64)
+        known = group >= 0
+        split = np.bincount(group[known] * width + terms[known], minlength=len(values) * width)
+        split = split.reshape(len(values), width)[:, order]
+        out = pd.DataFrame(split.T, index=labels, columns=[str(v) for v in values])
+        out = out.rename_axis("term").reset_index().melt(id_vars="term", var_name=by.name or "group", value_name="count")
+        return out[out["count"] > 0].reset_index(drop=True)
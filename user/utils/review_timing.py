@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Samples kept per span name for the rolling percentiles
+TIMING_WINDOW = 200
+# Emit one JSON line per span on stderr, for log collectors
+TIMING_LOG = os.getenv("REVIEWS_TIMING_LOG", "0") == "1"
+# Show the stage-timings expander in the dashboard sidebar
+SHOW_TIMINGS = os.getenv("REVIEWS_SHOW_TIMINGS", "0") == "1"
+
+_lock = threading.Lock()
+_samples: dict[str, deque] = {}
+
+_log = logging.getLogger("reviews.timing")
+if TIMING_LOG and not _log.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _log.addHandler(_handler)
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+
+def record(name: str, seconds: float, **fields):
+    with _lock:
+        _samples.setdefault(name, deque(maxlen=TIMING_WINDOW)).append(seconds)
+    if TIMING_LOG:
+        _log.info(json.dumps({"event": "span", "span": name, "ms": round(seconds * 1000, 3), "ts": time.time(), **fields}))
+
+@contextmanager
+def span(name: str, **fields):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0, **fields)
+
+def timed(name: str, fn, *args, **kwargs):
+    with span(name):
+        return fn(*args, **kwargs)
+
+def timing_summary() -> list[dict]:
+    with _lock:
+        snap = {k: np.array(v) for k, v in _samples.items()}
+    return [
+        {
+            "stage": k,
+            "runs": len(v),
+            "last ms": v[-1] * 1000,
+            "p50 ms": float(np.percentile(v, 50)) * 1000,
+            "p95 ms": float(np.percentile(v, 95)) * 1000,
+        }
+        for k, v in sorted(snap.items())
+    ]
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# The finest bucket that keeps the visible range under this many buckets is used
+MAX_BUCKETS = 400
+# Points per sentiment line once bucketed; longer lines are thinned with LTTB
+TREND_POINTS = int(os.getenv("REVIEWS_TREND_POINTS", "300"))
+
+BUCKET_SPANS = [("hour", pd.Timedelta(hours=1)), ("day", pd.Timedelta(days=1)),
+                ("week", pd.Timedelta(weeks=1)), ("month", pd.Timedelta(days=30))]
+
+def pick_bucket(start: pd.Timestamp, end: pd.Timestamp) -> str:
+    span = end - start
+    for name, size in BUCKET_SPANS:
+        if span / size <= MAX_BUCKETS:
+            return name
+    return "month"
+
+def floor_to(times: pd.Series, bucket: str) -> pd.Series:
+    t = times.dt.tz_convert(None) if times.dt.tz is not None else times
+    if bucket == "hour":
+        return t.dt.floor("h")
+    if bucket == "day":
+        return t.dt.floor("D")
+    if bucket == "week":
+        day = t.dt.floor("D")
+        return day - pd.to_timedelta(day.dt.weekday, unit="D")
+    return t.dt.to_period("M").dt.to_timestamp()
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = [0]
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        ax, ay = x[keep[-1]], y[keep[-1]]
+        bx, by = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((ax - bx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (by - ay))
+        keep.append(lo + int(area.argmax()))
+    keep.append(n - 1)
+    return np.asarray(keep)
+
+def downsample(ts: pd.DataFrame, x: str, y: str, by: str, points: int = TREND_POINTS) -> pd.DataFrame:
+    """Thin each ``by`` series of ``ts`` to at most ``points`` points."""
+    parts = []
+    for _, g in ts.groupby(by, observed=True, sort=False):
+        g = g.sort_values(x)
+        idx = lttb(g[x].to_numpy(dtype="datetime64[ns]").view("int64"), g[y].to_numpy(), points)
+        parts.append(g.iloc[idx])
+    return pd.concat(parts, ignore_index=True) if parts else ts